@@ -0,0 +1,107 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+# The compositors live in main.py, one directory up
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main
+from PIL import Image, ImageChops
+
+
+def random_layer(rng, size, kind):
+    """
+    Make a random RGBA layer.
+    :param kind: "opaque", "transparent" (fully transparent) or "mixed" alpha.
+    """
+    width, height = size
+    pixels = bytearray(rng.getrandbits(8) for _ in range(width*height*4))
+    if kind != "mixed":
+        pixels[3::4] = bytes([255 if kind == "opaque" else 0])*(width*height)
+    return Image.frombytes("RGBA", size, bytes(pixels))
+
+
+def max_difference(image_a, image_b):
+    """Get the largest difference between two RGBA images in any pixel and channel, in levels."""
+    if image_a.size != image_b.size:
+        return 255
+    difference = ImageChops.difference(image_a.convert("RGBA"), image_b.convert("RGBA"))
+    return max(channel_max for _, channel_max in difference.getextrema())
+
+
+def check_random_layers(count, seed):
+    """
+    Composite and brighten random layers with both backends.
+    :return: Largest difference found, in levels.
+    """
+    rng = random.Random(seed)
+    backends = [main.PilCompositor(), main.NumpyCompositor()]
+    worst = 0
+    for _ in range(count):
+        size = (rng.randint(1, 64), rng.randint(1, 64))
+        destination_kind = rng.choice(["opaque", "transparent", "mixed"])
+        destination = random_layer(rng, size, destination_kind)
+        layers = []
+        for _ in range(rng.randint(1, 3)):
+            layer_size = (rng.randint(1, size[0]), rng.randint(1, size[1]))
+            layer = random_layer(rng, layer_size, rng.choice(["opaque", "transparent", "mixed"]))
+            layers.append((layer, (rng.randint(0, size[0]-layer_size[0]), rng.randint(0, size[1]-layer_size[1]))))
+        composited = [backend.composite(destination.copy(), layers) for backend in backends]
+        worst = max(worst, max_difference(*composited))
+        factor = round(rng.uniform(0, 1.5), 4)
+        brightened = [backend.brighten(destination, factor) for backend in backends]
+        worst = max(worst, max_difference(*brightened))
+    return worst
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description="Time the pil and numpy compositing backends on real box art and check they give the same frames.")
+    parser.add_argument("--panels_dir", required=True, help="Directory of system image panels.")
+    parser.add_argument("--working_dir", required=True, help="Working directory for the catalogue index and logs.")
+    parser.add_argument("--stylish_font_path", required=True, help="Font used for text logos.")
+    parser.add_argument("--roms_dir", required=True, help="ROMs directory, every folder in it is rendered.")
+    parser.add_argument("--logos_dir", required=True, help="Directory of system logos.")
+    parser.add_argument("--core_info_dir", required=True, help="Folder core association directory.")
+    parser.add_argument("--system_map_path", required=True, help="Path to muosESmap.json.")
+    parser.add_argument("--valid_muos_system_names_path", required=True, help="Path to validMuOsSystemNames.txt.")
+    parser.add_argument("--screen_width", type=int, default=640, help="Screen width in pixels (default is 640).")
+    parser.add_argument("--screen_height", type=int, default=480, help="Screen height in pixels (default is 480).")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed renders of every folder per backend, after one warm-up render (default is 3).")
+    parser.add_argument("--random_layers", type=int, default=200, help="Number of random layer sets to check as well (default is 200).")
+    parser.add_argument("--tolerance", type=int, default=0, help="Largest allowed difference between the backends in levels per channel (default is 0).")
+    args = parser.parse_args()
+
+    options = {name: getattr(args, name) for name in ["roms_dir", "logos_dir", "core_info_dir", "system_map_path", "valid_muos_system_names_path"]}
+    frames = {}
+    for backend in main.COMPOSITORS:
+        renderer = main.Renderer.from_options("box_art", args.screen_width, args.screen_height, args.panels_dir, args.working_dir,
+                                              args.stylish_font_path, backend=backend, **options)
+        folders = renderer.config.folders
+        # The first render of each folder decodes its panels and logo, so it isn't timed
+        frames[backend] = {folder: renderer.render_folder(folder) for folder in folders}
+        start_time = time.perf_counter()
+        for _ in range(args.repeat):
+            for folder in folders:
+                renderer.render_folder(folder)
+        frame_time = (time.perf_counter()-start_time)/max(1, args.repeat*len(folders))
+        print(f"{backend}: {frame_time*1000:.1f} ms per warm box art frame ({len(folders)} folders x {args.repeat})")
+
+    worst = 0
+    for folder, pil_frame in frames["pil"].items():
+        difference = max_difference(pil_frame, frames["numpy"][folder])
+        worst = max(worst, difference)
+        if difference > args.tolerance:
+            print(f"{folder}: frames differ by up to {difference} levels")
+    print(f"Box art frames: largest difference {worst} levels")
+    random_worst = check_random_layers(args.random_layers, seed=0)
+    print(f"Random layers: largest difference {random_worst} levels over {args.random_layers} sets")
+
+    if max(worst, random_worst) > args.tolerance:
+        print(f"The backends differ by more than the tolerance of {args.tolerance} levels.")
+        sys.exit(1)
+    print(f"The backends match within the tolerance of {args.tolerance} levels.")
+
+
+if __name__ == "__main__":
+    main_benchmark()
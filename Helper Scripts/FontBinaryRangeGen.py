@@ -1,9 +1,11 @@
 import os
 import argparse
+import shutil
 import subprocess
 import re
 import json
 import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 
 def parse_ranges_file(file_path):
@@ -108,17 +110,69 @@ def check_lv_font_conv(lv_font_conv_path):
         return False
 
 
+def get_lv_font_conv_id(lv_font_conv_binary):
+    """Identify the lv_font_conv binary by its resolved path, size and modification time."""
+    lv_font_conv_path = shutil.which(lv_font_conv_binary) or lv_font_conv_binary
+    try:
+        lv_font_conv_stat = os.stat(lv_font_conv_path)
+    except OSError:
+        return lv_font_conv_binary
+    return f"{os.path.realpath(lv_font_conv_path)}|{lv_font_conv_stat.st_size}|{lv_font_conv_stat.st_mtime_ns}"
+
+
+def is_size_up_to_date(manifest_entry, size, output_file):
+    """Check if a previously generated binary for this size is still on disk and unchanged."""
+    size_entry = manifest_entry.get("sizes", {}).get(str(size))
+    if size_entry is None or not os.path.isfile(output_file):
+        return False
+    return size_entry["sha256"] == calculate_file_hash(output_file)
+
+
+def generate_font_binary(lv_font_conv_binary, font_path, size, ranges_string, output_file):
+    """Generate a single font binary, returning True on success."""
+    command = [
+        lv_font_conv_binary,
+        "--bpp", "4",
+        "--size", f"{size}",
+        "--font", font_path,
+        "-r", ranges_string,
+        "--format", "bin",
+        "--no-compress",
+        "--no-prefilter",
+        "-o", output_file,
+    ]
+    print(f"Generating binary for size {size} -> {output_file}")
+    try:
+        subprocess.run(command, check=True)
+    except subprocess.CalledProcessError as e:
+        print(f"Error generating binary for size {size}: {e}")
+        return False
+    return True
+
+
 def main():
     parser = argparse.ArgumentParser(description="Automate font binary generation.")
-    parser.add_argument("font_path", type=str, help="Path to the font file (e.g., FallingSkyBdObl.otf).")
+    parser.add_argument("font_path", type=str, nargs="+", help="Path to one or more font files (e.g., FallingSkyBdObl.otf).")
     parser.add_argument("output_dir", type=str, help="Directory to save the output binaries.")
     parser.add_argument("size_range", type=str, help="Range of sizes as 'min-max' (e.g., '0-100').")
     parser.add_argument("--step_size", type=int, default=1, help="Step size for the loop (default is 1).")
     parser.add_argument("--ranges_file", default="ranges.txt", type=str, help="Path to the ranges.txt file.")
     parser.add_argument("--cache_file", type=str, default="font_ranges_cache.json", help="Path to the cache file.")
     parser.add_argument("--lv_font_conv_binary", type=str, default="lv_font_conv", help="Path to the font file (e.g., FallingSkyBdObl.otf).")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Number of lv_font_conv processes to run at once (default is the CPU count).")
+    parser.add_argument("--manifest_file", type=str, default=None, help="Path to the manifest of generated binaries (default is font_manifest.json in output_dir).")
+    parser.add_argument("--force", action="store_true", help="Regenerate every size, even if it is already up to date.")
     args = parser.parse_args()
 
+    # Binaries are named after the font file, so two different fonts with the same name would overwrite each other's
+    font_paths_by_name = {}
+    for font_path in args.font_path:
+        font_name = os.path.splitext(os.path.basename(font_path))[0]
+        other_font_path = font_paths_by_name.setdefault(font_name, font_path)
+        if os.path.realpath(other_font_path) != os.path.realpath(font_path):
+            print(f"Fonts {other_font_path} and {font_path} would both write {font_name}-<size>.bin, rename one of them.")
+            return
+
     # Parse the ranges file
     print("Parsing Unicode ranges file...")
     ranges = parse_ranges_file(args.ranges_file)
@@ -134,44 +188,65 @@ def main():
 
     # Ensure output directory exists
     os.makedirs(args.output_dir, exist_ok=True)
+    manifest_file = args.manifest_file or os.path.join(args.output_dir, "font_manifest.json")
+    manifest = load_cache(manifest_file)
 
     # Check if lv_font_conv is available
     if not check_lv_font_conv(args.lv_font_conv_binary):
         print("lv_font_conv tool not found or not executable.")
         return
-
-    # Check which ranges are supported
-    supported_ranges = check_supported_ranges(args.font_path, ranges, args.cache_file, args.lv_font_conv_binary)
-    if not supported_ranges:
-        print("No supported ranges found for the font.")
-        return
-    print("Supported ranges:")
-    for unicode_range, block_name in supported_ranges.items():
-        print(f"{unicode_range} ({block_name})")
+    lv_font_conv_id = get_lv_font_conv_id(args.lv_font_conv_binary)
+
+    # Work out which binaries need generating for every font
+    jobs = []
+    for font_path in args.font_path:
+        # Check which ranges are supported
+        supported_ranges = check_supported_ranges(font_path, ranges, args.cache_file, args.lv_font_conv_binary)
+        if not supported_ranges:
+            print(f"No supported ranges found for the font: {font_path}")
+            continue
+        print(f"Supported ranges for {font_path}:")
+        for unicode_range, block_name in supported_ranges.items():
+            print(f"{unicode_range} ({block_name})")
+
+        font_hash = calculate_file_hash(font_path)
+        ranges_string = ",".join(supported_ranges.keys())
+        manifest_entry = manifest.get(font_hash, {})
+        if manifest_entry.get("ranges") != ranges_string or manifest_entry.get("lv_font_conv") != lv_font_conv_id:
+            # Anything generated with different inputs is stale
+            manifest_entry = {"sizes": {}}
+        manifest_entry["font_name"] = os.path.basename(font_path)
+        manifest_entry["ranges"] = ranges_string
+        manifest_entry["lv_font_conv"] = lv_font_conv_id
+        manifest[font_hash] = manifest_entry
+
+        font_name = os.path.splitext(os.path.basename(font_path))[0]
+        for size in range(size_min, size_max + 1, args.step_size):
+            output_file = os.path.join(args.output_dir, f"{font_name}-{size}.bin")
+            if not args.force and is_size_up_to_date(manifest_entry, size, output_file):
+                print(f"Skipping up to date binary for size {size} -> {output_file}")
+                continue
+            jobs.append((font_hash, font_path, size, ranges_string, output_file))
 
     # Generate font binaries
-    size = size_min
-    font_name = os.path.splitext(os.path.basename(args.font_path))[0]
-    while size <= size_max:
-        output_file = os.path.join(args.output_dir, f"{font_name}-{size}.bin")
-        command = [
-            args.lv_font_conv_binary,
-            "--bpp", "4",
-            "--size", f"{size}",
-            "--font", args.font_path,
-            "-r", ",".join(supported_ranges.keys()),
-            "--format", "bin",
-            "--no-compress",
-            "--no-prefilter",
-            "-o", output_file,
-        ]
-        print(f"Generating binary for size {size} -> {output_file}")
-        try:
-            subprocess.run(command, check=True)
-        except subprocess.CalledProcessError as e:
-            print(f"Error generating binary for size {size}: {e}")
-
-        size += args.step_size
+    print(f"Generating {len(jobs)} font binaries using {args.workers} worker(s)")
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        futures = {}
+        for job in jobs:
+            font_hash, font_path, size, ranges_string, output_file = job
+            futures[executor.submit(generate_font_binary, args.lv_font_conv_binary, font_path, size, ranges_string, output_file)] = job
+        for future in as_completed(futures):
+            font_hash, _, size, _, output_file = futures[future]
+            if future.result():
+                manifest[font_hash]["sizes"][str(size)] = {
+                    "file": os.path.basename(output_file),
+                    "sha256": calculate_file_hash(output_file),
+                }
+            else:
+                manifest[font_hash]["sizes"].pop(str(size), None)
+
+    save_cache(manifest, manifest_file)
+    print(f"Manifest written to {manifest_file}")
 
 
 if __name__ == "__main__":
@@ -1,14 +1,28 @@
+import time
+startup_time = time.perf_counter()  # For --startup_report
 import argparse
 import os
 import subprocess
 import sys
 import json
 import logging
+import atexit
+import queue
+from logging.handlers import QueueHandler, QueueListener
 import re
 import shutil
 import hashlib
-from natsort import natsorted
-from PIL import Image, ImageDraw, ImageEnhance, ImageOps, ImageFilter, ImageFont
+import copy
+from collections import deque, OrderedDict
+import threading
+import io
+import stat
+import bisect
+import struct
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from PIL import Image
+# Modules only some stages use (natsort, zipfile, tempfile, multiprocessing and every Pillow module but Image) are imported
+# where they are first needed, so a run only loads what its mode uses. They stay plain import statements so PyInstaller still finds them.
 
 def ceil(n):
     """
@@ -26,7 +40,16 @@ def floor(n):
     return int(n) if n >= 0 or n == int(n) else int(n) - 1
 
 
-def setup_logger(log_file_output_dir, log_file_name="AutoArtBookNextLog.log"):
+def setup_logger(log_file_output_dir, log_file_name="AutoArtBookNextLog.log", log_level="INFO", stream=None):
+    """
+    Set up logging to the log file and stdout.
+    Records are put on a queue and written by a background listener thread, so logging never blocks on SD card I/O.
+    :param log_file_output_dir: Directory to write the log file to.
+    :param log_file_name: Name of the log file.
+    :param log_level: Minimum level to log (e.g. "DEBUG", "INFO").
+    :param stream: Console stream to log to instead of stdout.
+    :return: Logger instance.
+    """
     # Ensure the output directory exists
     os.makedirs(log_file_output_dir, exist_ok=True)
     
@@ -35,35 +58,598 @@ def setup_logger(log_file_output_dir, log_file_name="AutoArtBookNextLog.log"):
     
     # Create a custom logging configuration
     log_format = "%(asctime)s - %(levelname)s - %(message)s"
+    formatter = logging.Formatter(log_format)
+    file_handler = logging.FileHandler(log_file_path, encoding="utf-8")
+    file_handler.setFormatter(formatter)
+    stream_handler = logging.StreamHandler(stream or sys.stdout)  # Send logs to the console
+    stream_handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    queue_listener = QueueListener(log_queue, file_handler, stream_handler)
+    queue_listener.start()
+    atexit.register(queue_listener.stop)  # Flush anything still queued on exit
+
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))  # The listener's handlers apply the real format
     logging.basicConfig(
-        level=logging.DEBUG,
-        format=log_format,
-        handlers=[
-            logging.FileHandler(log_file_path, encoding="utf-8"),
-            logging.StreamHandler(sys.stdout),  # Send logs to the console
-        ],
+        level=log_level,
+        handlers=[queue_handler],
     )
     
     # Return the logger instance
     return logging.getLogger(__name__)
 
+module_logger = logging.getLogger(__name__)
+
+class ProgressReporter(object):
+    """
+    Writes machine readable progress events, one JSON object per line, to a file or file descriptor.
+    Each event carries the stage, item counts, elapsed time and an ETA from a moving average of recent item times.
+    Stages are tracked per thread, so tasks running at the same time each report their own stage.
+    With no output configured every method returns straight away.
+    """
+    def __init__(self, stream=None, average_window=10, target=None, parent=None):
+        self.stream = stream
+        self.target = target
+        self.parent = parent
+        self.average_window = average_window
+        self.lock = parent.lock if parent is not None else threading.Lock()
+        self.run_start_time = parent.run_start_time if parent is not None else time.perf_counter()
+        self.local = threading.local()
+    def get_stage_state(self):
+        state = self.local
+        if not hasattr(state, "stage"):
+            state.stage = None
+            state.stage_total = 0
+            state.stage_done = 0
+            state.stage_start_time = None
+            state.last_item_time = None
+            state.item_durations = deque(maxlen=self.average_window)
+        return state
+    def for_target(self, target):
+        """Get a reporter for one of several targets rendered at once, writing to the same output with a "target" field."""
+        return ProgressReporter(self.stream, self.average_window, target, self)
+    @classmethod
+    def from_args(cls, progress_file=None, progress_fd=None):
+        if progress_fd is not None:
+            return cls(os.fdopen(progress_fd, "w", buffering=1, encoding="utf-8"))
+        if progress_file is not None:
+            return cls(open(progress_file, "w", buffering=1, encoding="utf-8"))
+        return cls()
+    def emit(self, event, **fields):
+        if self.parent is not None and self.parent.stream is None:
+            self.stream = None
+        if self.stream is None:
+            return
+        now = time.perf_counter()
+        record = {"event": event, "time": round(time.time(), 3), "elapsed": round(now-self.run_start_time, 3)}
+        if self.target is not None:
+            record["target"] = self.target
+        state = self.get_stage_state()
+        if state.stage is not None:
+            record["stage"] = state.stage
+            record["done"] = state.stage_done
+            record["total"] = state.stage_total
+            record["stage_elapsed"] = round(now-state.stage_start_time, 3)
+        record.update(fields)
+        with self.lock:
+            try:
+                self.stream.write(json.dumps(record) + "\n")
+            except (OSError, ValueError):
+                # Whoever was reading has gone away, carry on without progress output
+                self.stream = None
+                if self.parent is not None:
+                    self.parent.stream = None
+    def start_stage(self, stage, total=0):
+        state = self.get_stage_state()
+        state.stage = stage
+        state.stage_total = total
+        state.stage_done = 0
+        state.stage_start_time = state.last_item_time = time.perf_counter()
+        state.item_durations.clear()
+        self.emit("stage_start")
+    def item_finished(self, item=None):
+        state = self.get_stage_state()
+        now = time.perf_counter()
+        state.stage_done += 1
+        state.item_durations.append(now-state.last_item_time)
+        state.last_item_time = now
+        if self.stream is None:
+            return
+        average_item_time = sum(state.item_durations)/len(state.item_durations)
+        eta = average_item_time*max(state.stage_total-state.stage_done, 0)
+        self.emit("item_finished", item=item, eta=round(eta, 3))
+    def finish_stage(self):
+        self.emit("stage_finish")
+        self.get_stage_state().stage = None
+    def close(self, status="ok"):
+        self.emit("run_finish", status=status)
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+
+class LRUImageCache(object):
+    """
+    Small least-recently-used cache of decoded images, so memory stays bounded however many items are rendered.
+    Cached images are shared between callers and must not be modified in place.
+    """
+    def __init__(self, maxsize=16):
+        self.maxsize = maxsize
+        self.images = OrderedDict()
+        self.lock = threading.Lock()
+    def get(self, key, loader):
+        with self.lock:
+            if key in self.images:
+                self.images.move_to_end(key)
+                return self.images[key]
+        image = loader()
+        with self.lock:
+            self.images[key] = image
+            self.images.move_to_end(key)
+            while len(self.images) > self.maxsize:
+                self.images.popitem(last=False)
+        return image
+    def clear(self):
+        with self.lock:
+            self.images.clear()
+
+class SharedAssetStore(object):
+    """
+    Decoded images packed into one shared memory block, so render worker processes read the same pixels
+    rather than each decoding and holding its own copy.
+    Has the same get interface as LRUImageCache. Images it returns are read-only views of the block.
+    """
+    # Modes whose pixels Image.frombuffer can use in place, anything else would be copied per worker anyway
+    SHAREABLE_MODES = ("L", "RGBA", "RGBX", "CMYK")
+    def __init__(self, block, entries, owner):
+        self.block = block
+        self.entries = entries
+        self.owner = owner
+    @classmethod
+    def create(cls, images):
+        """
+        Pack images into a new shared memory block.
+        :param images: Dictionary of key to image. Images in modes that can't be shared are left out.
+        :return: SharedAssetStore that owns the block.
+        """
+        from multiprocessing import shared_memory
+        entries, offset = {}, 0
+        images = {key: image for key, image in images.items() if image is not None and image.mode in cls.SHAREABLE_MODES}
+        for key, image in images.items():
+            entries[key] = (offset, image.mode, image.size)
+            offset += image.width*image.height*Image.getmodebands(image.mode)
+        block = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for key, image in images.items():
+            start = entries[key][0]
+            data = image.tobytes()
+            block.buf[start:start+len(data)] = data
+        return cls(block, entries, True)
+    @property
+    def index(self):
+        """Picklable description of the store for attach."""
+        return (self.block.name, self.entries)
+    @classmethod
+    def attach(cls, index):
+        """
+        Open a store created by another process.
+        :param index: The creating store's index.
+        """
+        from multiprocessing import shared_memory
+        name, entries = index
+        try:
+            block = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Before Python 3.13 attaching always registers the block, with the resource tracker workers share
+            # with the creating process, so it is still unlinked once, by close
+            block = shared_memory.SharedMemory(name=name)
+        return cls(block, entries, False)
+    def get(self, key, loader):
+        entry = self.entries.get(key)
+        if entry is None:
+            return loader()
+        offset, mode, size = entry
+        length = size[0]*size[1]*Image.getmodebands(mode)
+        return Image.frombuffer(mode, size, self.block.buf[offset:offset+length], "raw", mode, 0, 1)
+    def close(self):
+        """Close the block, and remove it if this store created it."""
+        self.block.close()
+        if self.owner:
+            self.block.unlink()
+
+def set_layer_bbox(image, bbox):
+    """
+    Record the part of a layer that isn't fully transparent, so compositing can skip the rest of it.
+    :param bbox: (left, top, right, bottom) box, or None if the layer is fully transparent.
+    :return: The image.
+    """
+    image.info["layer_bbox"] = bbox
+    return image
+
+def get_layer_bbox(image):
+    """Get the box recorded with set_layer_bbox, or the whole image if there isn't one."""
+    return image.info.get("layer_bbox", (0, 0) + image.size)
+
+def union_bbox(boxes, size=None):
+    """
+    Get the smallest box containing all the given boxes, skipping None.
+    :param size: If given, clip the result to (0, 0, width, height).
+    :return: (left, top, right, bottom) box, or None if there is nothing to contain.
+    """
+    boxes = [box for box in boxes if box is not None]
+    if not boxes:
+        return None
+    left, top = min(box[0] for box in boxes), min(box[1] for box in boxes)
+    right, bottom = max(box[2] for box in boxes), max(box[3] for box in boxes)
+    if size is not None:
+        left, top, right, bottom = max(left, 0), max(top, 0), min(right, size[0]), min(bottom, size[1])
+        if right <= left or bottom <= top:
+            return None
+    return (left, top, right, bottom)
+
+class CanvasPool(object):
+    """
+    Small pool of reusable RGBA canvases, so rendering frame after frame reuses the same few full-size buffers
+    rather than allocating and freeing new ones each time.
+    Canvases are cleared in place when borrowed and must not be used again once released.
+    """
+    def __init__(self, maxsize=4, on_release=None):
+        self.maxsize = maxsize
+        self.on_release = on_release
+        self.free_canvases = {}
+        self.lock = threading.Lock()
+        self.allocated = 0
+        self.reused = 0
+    def borrow(self, size, colour=(0, 0, 0, 0)):
+        """
+        Get a canvas of the given size filled with colour.
+        :param size: (width, height) tuple.
+        :param colour: RGBA tuple or colour string.
+        :return: RGBA image.
+        """
+        with self.lock:
+            free_canvases = self.free_canvases.get(size)
+            canvas = free_canvases.pop() if free_canvases else None
+            if canvas is None:
+                self.allocated += 1
+            else:
+                self.reused += 1
+        if canvas is None:
+            return Image.new("RGBA", size, colour)
+        if isinstance(colour, str):
+            from PIL import ImageColor
+            colour = ImageColor.getcolor(colour, "RGBA")
+        canvas.paste(colour, (0, 0, size[0], size[1]))
+        canvas.info.clear()
+        return canvas
+    def release(self, canvas):
+        """Give a borrowed canvas back to the pool."""
+        if self.on_release is not None:
+            self.on_release(canvas)
+        with self.lock:
+            free_canvases = self.free_canvases.setdefault(canvas.size, [])
+            if len(free_canvases) < self.maxsize and all(free_canvas is not canvas for free_canvas in free_canvases):
+                free_canvases.append(canvas)
+
+class PilCompositor(object):
+    """Compositing backend using Pillow's own brightness and alpha compositing."""
+    name = "pil"
+    def brighten(self, image, factor):
+        from PIL import ImageEnhance
+        return ImageEnhance.Brightness(image).enhance(factor)
+    def composite(self, canvas, layers):
+        """
+        Alpha composite layers onto the canvas in order.
+        :param canvas: RGBA image, modified in place.
+        :param layers: List of (RGBA image, (x, y)) tuples.
+        :return: The canvas.
+        """
+        for layer, (x, y) in layers:
+            # Only blend the part of the layer that can change the canvas
+            layer_bbox = get_layer_bbox(layer)
+            if layer_bbox is None:
+                continue
+            if layer_bbox == (0, 0) + layer.size:
+                canvas.alpha_composite(layer, (x, y))
+            else:
+                canvas.alpha_composite(layer, (x+layer_bbox[0], y+layer_bbox[1]), layer_bbox)
+        return canvas
+    def forget(self, layer):
+        """Drop anything held for a layer that is about to be reused."""
+        pass
+
+class NumpyCompositor(object):
+    """
+    Compositing backend holding the frame as a NumPy array while all its layers are blended,
+    with brightness applied through a lookup table.
+    Reproduces Pillow's integer alpha compositing and brightness rounding, so frames are identical to the Pillow backend:
+    a tolerance of 0 levels per channel, which Helper Scripts/CompositorBenchmark.py checks along with the timings.
+    """
+    name = "numpy"
+    PRECISION_BITS = 7  # Same fixed point precision as Pillow's AlphaComposite.c
+    def __init__(self, layer_cache_size=32):
+        import numpy
+        self.np = numpy
+        self.brightness_tables = {}
+        # Panels and the gradient are reused across frames, so keep their pixel arrays rather than converting every frame
+        self.layer_arrays = OrderedDict()
+        self.layer_cache_size = layer_cache_size
+        self.lock = threading.Lock()
+    def get_layer_array(self, layer):
+        with self.lock:
+            cached = self.layer_arrays.get(id(layer))
+            if cached is not None and cached[0] is layer:
+                self.layer_arrays.move_to_end(id(layer))
+                return cached[1], cached[2]
+        layer_array = self.np.asarray(layer.convert("RGBA") if layer.mode != "RGBA" else layer)
+        layer_bbox = layer.info["layer_bbox"] if "layer_bbox" in layer.info else layer.getbbox()
+        with self.lock:
+            # Holding the layer itself stops its id being reused while the entry exists
+            self.layer_arrays[id(layer)] = (layer, layer_array, layer_bbox)
+            while len(self.layer_arrays) > self.layer_cache_size:
+                self.layer_arrays.popitem(last=False)
+        return layer_array, layer_bbox
+    def forget(self, layer):
+        """Drop the cached array of a layer that is about to be reused."""
+        with self.lock:
+            cached = self.layer_arrays.get(id(layer))
+            if cached is not None and cached[0] is layer:
+                del self.layer_arrays[id(layer)]
+    def brighten(self, image, factor):
+        np = self.np
+        if factor not in self.brightness_tables:
+            # Image.blend with black in single precision, truncated like Pillow does
+            table = np.arange(256, dtype=np.float32) * np.float32(factor)
+            self.brightness_tables[factor] = np.clip(table, 0, 255).astype(np.uint8)
+        pixels = np.array(image.convert("RGBA"))
+        pixels[..., :3] = self.brightness_tables[factor][pixels[..., :3]]
+        return Image.fromarray(pixels, "RGBA")
+    def composite(self, canvas, layers):
+        """
+        Alpha composite layers onto the canvas in order.
+        :param canvas: RGBA image, modified in place.
+        :param layers: List of (RGBA image, (x, y)) tuples.
+        :return: The canvas.
+        """
+        np = self.np
+        frame = np.array(canvas)
+        # Compositing onto an opaque frame keeps it opaque, which allows a cheaper blend
+        opaque = bool((frame[..., 3] == 255).all())
+        for layer, (x, y) in layers:
+            # Only the visible part of the layer can change the frame
+            layer_array, layer_bbox = self.get_layer_array(layer)
+            if layer_bbox is None:
+                continue
+            left, top = max(x+layer_bbox[0], 0), max(y+layer_bbox[1], 0)
+            right, bottom = min(x+layer_bbox[2], frame.shape[1]), min(y+layer_bbox[3], frame.shape[0])
+            if right <= left or bottom <= top:
+                continue
+            source = layer_array[top-y:bottom-y, left-x:right-x]
+            destination = frame[top:bottom, left:right]
+            destination[...] = self.alpha_composite(destination, source, opaque)
+        canvas.paste(Image.fromarray(frame, "RGBA"))
+        return canvas
+    def alpha_composite(self, destination, source, opaque=False):
+        """
+        Alpha composite two RGBA uint8 arrays of the same shape with Pillow's integer arithmetic.
+        :param opaque: Whether the destination is known to be fully opaque.
+        """
+        np = self.np
+        precision = self.PRECISION_BITS
+        if opaque:
+            # With an opaque destination Pillow's coefficients reduce to exact multiples of the source alpha,
+            # and the fixed point shifts cancel out, so the whole blend fits in 16 bits
+            source_alpha = source[..., 3:4].astype(np.uint16)
+            colour = source[..., :3]*source_alpha + destination[..., :3]*(255-source_alpha) + 0x80
+            result = np.empty_like(destination)
+            result[..., :3] = ((colour >> 8) + colour) >> 8
+            result[..., 3] = 255
+            return result
+        # A transparent source leaves the destination as it is and a transparent destination gives the source back,
+        # so only pixels where both have some alpha need the full blend
+        result = np.where(source[..., 3:4] == 0, destination, source)
+        overlap = (source[..., 3] != 0) & (destination[..., 3] != 0)
+        if not overlap.any():
+            return result
+        source = source[overlap]
+        destination = destination[overlap]
+        source_alpha = source[..., 3].astype(np.uint32)
+        destination_alpha = destination[..., 3].astype(np.uint32)
+        out_alpha_255 = source_alpha*255 + destination_alpha*(255-source_alpha)
+        coefficient_1 = (source_alpha*(255*255*(1 << precision))) // out_alpha_255
+        coefficient_2 = 255*(1 << precision) - coefficient_1
+        colour = (source[..., :3].astype(np.uint32)*coefficient_1[..., None]
+                  + destination[..., :3].astype(np.uint32)*coefficient_2[..., None]
+                  + (0x80 << precision))
+        blended = np.empty_like(destination)
+        blended[..., :3] = (((colour >> 8) + colour) >> 8) >> precision
+        out_alpha_255 += 0x80
+        blended[..., 3] = ((out_alpha_255 >> 8) + out_alpha_255) >> 8
+        result[overlap] = blended
+        return result
+
+COMPOSITORS = {"pil": PilCompositor, "numpy": NumpyCompositor}
+
+def get_compositor(backend="pil"):
+    """
+    Get a compositing backend by name.
+    :param backend: "pil" or "numpy".
+    :return: Compositor object.
+    """
+    return COMPOSITORS[backend]()
+
+class ResourceGovernor(object):
+    """
+    Keeps on-device runs under a target temperature or load, so the handheld doesn't throttle and its UI stays responsive.
+    Caps worker counts to the CPUs the cgroup quota allows and halves them when the device is already too hot or busy,
+    and backs off between frames, doubling the pause while over target and halving it once back under.
+    Does nothing unless a target temperature or load is given.
+    Paths can be pointed elsewhere for testing.
+    """
+    def __init__(self, logger, target_temperature=None, target_load=None,
+                 loadavg_path="/proc/loadavg",
+                 cpu_max_path="/sys/fs/cgroup/cpu.max",
+                 cpu_cfs_dir="/sys/fs/cgroup/cpu",
+                 thermal_dir="/sys/class/thermal",
+                 check_interval=2, min_backoff=0.1, max_backoff=5, sleep=time.sleep):
+        """
+        :param target_temperature: Hottest thermal zone temperature to hold, in degrees Celsius.
+        :param target_load: 1 minute load average per available CPU to hold.
+        :param check_interval: Seconds between readings while rendering.
+        :param min_backoff: First pause between frames when over target, in seconds.
+        :param max_backoff: Longest pause between frames, in seconds.
+        :param sleep: Function used to pause.
+        """
+        self.logger = logger
+        self.target_temperature = target_temperature
+        self.target_load = target_load
+        self.enabled = target_temperature is not None or target_load is not None
+        self.loadavg_path = loadavg_path
+        self.cpu_max_path = cpu_max_path
+        self.cpu_cfs_dir = cpu_cfs_dir
+        self.thermal_dir = thermal_dir
+        self.check_interval = check_interval
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.sleep = sleep
+        self.lock = threading.Lock()
+        self.backoff = 0
+        self.last_check_time = None
+        self.total_backoff = 0
+        self.pauses = 0
+    def read_load(self):
+        """:return: 1 minute load average, or None if it can't be read."""
+        try:
+            with open(self.loadavg_path, "r") as file:
+                return float(file.read().split()[0])
+        except (OSError, ValueError, IndexError):
+            return None
+    def read_cpu_quota(self):
+        """:return: Number of CPUs the cgroup CPU quota allows, or None if there is no quota."""
+        try:
+            # cgroup v2: "<quota> <period>", or "max <period>" for no quota
+            with open(self.cpu_max_path, "r") as file:
+                quota, period = file.read().split()[:2]
+            return None if quota == "max" else int(quota)/int(period)
+        except (OSError, ValueError):
+            pass
+        try:
+            # cgroup v1: a quota of -1 means no quota
+            with open(os.path.join(self.cpu_cfs_dir, "cpu.cfs_quota_us"), "r") as file:
+                quota = int(file.read())
+            with open(os.path.join(self.cpu_cfs_dir, "cpu.cfs_period_us"), "r") as file:
+                period = int(file.read())
+            return None if quota <= 0 else quota/period
+        except (OSError, ValueError):
+            return None
+    def read_temperature(self):
+        """:return: Temperature of the hottest thermal zone in degrees Celsius, or None if none can be read."""
+        temperatures = []
+        try:
+            zones = [zone for zone in os.listdir(self.thermal_dir) if zone.startswith("thermal_zone")]
+        except OSError:
+            return None
+        for zone in zones:
+            try:
+                with open(os.path.join(self.thermal_dir, zone, "temp"), "r") as file:
+                    temperature = int(file.read())
+            except (OSError, ValueError):
+                continue
+            # Zones report millidegrees, a few drivers report whole degrees
+            temperatures.append(temperature/1000 if abs(temperature) >= 1000 else temperature)
+        return max(temperatures) if temperatures else None
+    def get_cpus(self):
+        """:return: Number of CPUs this process can use, counting the cgroup quota."""
+        cpus = os.cpu_count() or 1
+        quota = self.read_cpu_quota()
+        if quota is not None:
+            cpus = max(1, min(cpus, int(quota+0.999)))
+        return cpus
+    def read_state(self):
+        """:return: (temperature, load per CPU, whether either is over its target)"""
+        temperature = self.read_temperature() if self.target_temperature is not None else None
+        load = self.read_load() if self.target_load is not None else None
+        load_per_cpu = None if load is None else load/self.get_cpus()
+        over_target = ((temperature is not None and temperature > self.target_temperature)
+                       or (load_per_cpu is not None and load_per_cpu > self.target_load))
+        return temperature, load_per_cpu, over_target
+    def describe_state(self, temperature, load_per_cpu):
+        readings = []
+        if temperature is not None:
+            readings.append(f"temperature {temperature:.1f}C (target {self.target_temperature:g}C)")
+        if load_per_cpu is not None:
+            readings.append(f"load {load_per_cpu:.2f} per CPU (target {self.target_load:g})")
+        return ", ".join(readings) or "no readings available"
+    def get_workers(self, requested, name):
+        """
+        Get how many workers to run.
+        :param requested: Number of workers that would be used without the governor.
+        :param name: What the workers are for, for the log.
+        :return: Number of workers, at least 1.
+        """
+        if not self.enabled:
+            return requested
+        cpus = self.get_cpus()
+        workers = max(1, min(requested, cpus))
+        temperature, load_per_cpu, over_target = self.read_state()
+        if over_target:
+            workers = max(1, workers//2)
+        if workers != requested:
+            self.logger.info(f"Governor: running {name} on {workers} of {requested} workers ({cpus} CPUs available, {self.describe_state(temperature, load_per_cpu)})")
+        return workers
+    def pause(self):
+        """Call between frames. Rechecks the readings every check_interval seconds and waits for the current back-off."""
+        if not self.enabled:
+            return
+        with self.lock:
+            now = time.perf_counter()
+            if self.last_check_time is None or now-self.last_check_time >= self.check_interval:
+                self.last_check_time = now
+                temperature, load_per_cpu, over_target = self.read_state()
+                if over_target:
+                    backoff = min(self.max_backoff, max(self.min_backoff, self.backoff*2))
+                else:
+                    backoff = self.backoff/2 if self.backoff/2 >= self.min_backoff else 0
+                if backoff != self.backoff:
+                    self.logger.info(f"Governor: {'over' if over_target else 'under'} target, {self.describe_state(temperature, load_per_cpu)}, "
+                                     f"pausing {backoff:.2f}s between frames")
+                    self.backoff = backoff
+            backoff = self.backoff
+            if backoff:
+                self.total_backoff += backoff
+                self.pauses += 1
+        if backoff:
+            self.sleep(backoff)
+    def log_stats(self):
+        if self.pauses:
+            self.logger.info(f"Governor: paused {self.pauses} times between frames, {self.total_backoff:.1f}s in total")
+
 class Config(object):
-    def __init__(self, args, logger):
+    def __init__(self, args, logger, progress=None):
         self.logger = logger
         self.roms_dir = args.roms_dir
         self.box_art_dir = args.box_art_dir
         self.panels_dir = args.panels_dir
         self.logos_dir = args.logos_dir
         self.core_info_dir = args.core_info_dir
+        self.working_dir = args.working_dir
+        self.progress = progress if progress is not None else ProgressReporter.from_args(args.progress_file, args.progress_fd)
         self.folders = []
         self.folder_console_associations = {}
         self.system_map_path = ""
+        self.catalogue_index = CatalogueIndex()  # Only box art uses the folders, see below
+        self.output_writer = OutputWriter(os.path.join(self.working_dir, ".output_digests.json"))
+        self.output_encoder = OutputEncoder(args.output_mode, args.palette_colours, not args.no_dither)
+        # The system map and the example panel are loaded when first used, so runs that don't need them skip the work
+        self.asset_lock = threading.Lock()
+        self.loaded_system_map = None
+        self.panel_metrics = None
         if args.mode in ["box_art", "both"]:
             self.system_map_path = args.system_map_path
-            with open(self.system_map_path, "r") as file:
-                self.system_map = json.load(file)
-            self.folders = get_folders(self.roms_dir)
-            self.folder_console_associations = get_folder_core_associations(self.folders, self.core_info_dir)
+            self.catalogue_index = CatalogueIndex(os.path.join(self.working_dir, ".catalogue_index.json"))
+            self.folders = get_folders(self.roms_dir, logger, self.catalogue_index)
+            self.folder_console_associations = get_folder_core_associations(self.folders, self.core_info_dir, self.catalogue_index)
+            self.catalogue_index.save()
+            self.catalogue_index.log_stats(logger)
         self.valid_muos_system_names_path = args.valid_muos_system_names_path
         self.stylish_font_path = args.stylish_font_path
         self.font_path = args.font_path
@@ -79,16 +665,19 @@ class Config(object):
         self.selected_brightness = args.selected_brightness
         self.shadow_strength = args.shadow_strength
         self.gradient_intensity = args.gradient_intensity
-
-        self.example_panel_image = Image.open(os.path.join(self.panels_dir, f"_default.png")).convert("RGBA")
-        self.panel_height = self.example_panel_image.height
-        self.panel_width = self.example_panel_image.width
-
-        first_row = list(self.example_panel_image.getdata())[0:self.example_panel_image.width]
-        alpha_threshold = 200
-        self.real_panel_width = sum(1 for pixel in first_row if pixel[3] > alpha_threshold)
+        self.backend = args.backend
+        self.compositor = get_compositor(args.backend)
+        self.canvas_pool = CanvasPool(on_release=self.compositor.forget)
+        self.render_processes = args.render_processes
+        self.governor = ResourceGovernor(logger, args.target_temperature, args.target_load)
+        self.journal = CheckpointJournal(os.path.join(self.working_dir, ".checkpoint_journal.jsonl"), args.resume)
 
         self.gradient_overlay_image = None
+        self.gradient_overlay_lock = threading.Lock()
+        self.es_item_names = None
+        self.panel_image_cache = LRUImageCache(16)
+        self.logo_image_cache = None  # Only worth the memory when the same logos are rendered repeatedly, see Renderer
+        self.source_image_cache = None  # Decoded panels and logos shared with render worker processes, see renderFoldersInProcesses
         self.special_cases = {r'^ngp$': 'es_systems/ngp',
                               r'neo.*?geo.*?pocket(?!.*?colou?r)': 'es_systems/ngp'}
 
@@ -159,13 +748,491 @@ class Config(object):
     def log_associations(self):
         for folder in self.folder_console_associations.keys():
             self.logger.info(f"  {folder}: {self.folder_console_associations[folder]}")
+    @property
+    def system_map(self):
+        with self.asset_lock:
+            if self.loaded_system_map is None:
+                start_time = time.perf_counter()
+                with open(self.system_map_path, "r") as file:
+                    self.loaded_system_map = json.load(file)
+                startup_report.add("load system map", time.perf_counter()-start_time)
+            return self.loaded_system_map
+    def get_panel_metrics(self):
+        """
+        Load the example panel the first time it is needed.
+        :return: (panel width, panel height, width of the opaque part of the panel's top row) tuple.
+        """
+        with self.asset_lock:
+            if self.panel_metrics is None:
+                start_time = time.perf_counter()
+                with Image.open(os.path.join(self.panels_dir, "_default.png")) as example_panel_image:
+                    example_panel_image = example_panel_image.convert("RGBA")
+                alpha_threshold = 200
+                first_row_alpha = example_panel_image.getchannel("A").crop((0, 0, example_panel_image.width, 1))
+                real_panel_width = sum(first_row_alpha.histogram()[alpha_threshold+1:])
+                self.panel_metrics = (example_panel_image.width, example_panel_image.height, real_panel_width)
+                startup_report.add("load example panel", time.perf_counter()-start_time)
+            return self.panel_metrics
+    @property
+    def panel_width(self):
+        return self.get_panel_metrics()[0]
+    @property
+    def panel_height(self):
+        return self.get_panel_metrics()[1]
+    @property
+    def real_panel_width(self):
+        return self.get_panel_metrics()[2]
     def get_gradient_overlay_image(self, width, height, start_colour, end_colour, gradient_height_percent):
-        if self.gradient_overlay_image is None:
-            self.gradient_overlay_image = generateGradientImage(width, height, start_colour, end_colour, gradient_height_percent, self)
+        # Box art and theme images can be rendered at the same time, only one of them should generate the gradient
+        with self.gradient_overlay_lock:
+            if self.gradient_overlay_image is None:
+                gradient_overlay_image = generateGradientImage(width, height, start_colour, end_colour, gradient_height_percent, self)
+                # Below the gradient it's the end colour, usually fully transparent, so most of the frame needn't be blended
+                self.gradient_overlay_image = set_layer_bbox(gradient_overlay_image, gradient_overlay_image.getbbox())
         return self.gradient_overlay_image
+    def __copy__(self):
+        # A plain shallow copy that shares everything, __getstate__ is only for sending to worker processes
+        config = Config.__new__(Config)
+        config.__dict__.update(self.__dict__)
+        return config
+    # Settings sent to render worker processes, which only render frames: files, progress and caches stay in this process
+    WORKER_STATE = ["logger", "roms_dir", "box_art_dir", "panels_dir", "logos_dir", "core_info_dir", "working_dir",
+                    "folders", "folder_console_associations", "es_item_names", "system_map_path", "loaded_system_map",
+                    "valid_muos_system_names_path", "stylish_font_path", "font_path", "screen_width", "screen_height",
+                    "background_hex", "gap_between_panels", "icon_height_percent", "icon_width_percent", "max_icon_height", "max_icon_width",
+                    "deselected_brightness", "selected_brightness", "shadow_strength", "gradient_intensity", "render_processes",
+                    "special_cases", "arcade_cases", "pce_cases", "backend"]
+    def __getstate__(self):
+        state = {name: self.__dict__[name] for name in Config.WORKER_STATE}
+        state["panel_metrics"] = self.get_panel_metrics()  # Load once here rather than in every worker
+        state["output_encoder"] = (self.output_encoder.output_mode, self.output_encoder.palette_colours, self.output_encoder.dither)
+        return state
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.output_encoder = OutputEncoder(*state["output_encoder"])
+        self.progress = ProgressReporter()
+        self.catalogue_index = CatalogueIndex()
+        self.output_writer = OutputWriter()
+        self.panel_image_cache = LRUImageCache(16)
+        self.logo_image_cache = None
+        self.source_image_cache = None
+        self.compositor = get_compositor(self.backend)
+        self.canvas_pool = CanvasPool(on_release=self.compositor.forget)
+        self.gradient_overlay_image = None
+        self.gradient_overlay_lock = threading.Lock()
+        self.asset_lock = threading.Lock()
+        # Workers render as they are fed, the governor in the parent process paces them
+        self.governor = ResourceGovernor(self.logger)
+        self.journal = CheckpointJournal()
+    def with_screen_size(self, screen_width, screen_height, progress=None):
+        """
+        Get a copy of this config for another screen size.
+        Folders, associations and decoded panel images are shared with this config, only size dependent state is reset.
+        """
+        config = copy.copy(self)
+        config.screen_width = screen_width
+        config.screen_height = screen_height
+        config.max_icon_height = (screen_height * self.icon_height_percent)
+        config.max_icon_width = (screen_width * self.icon_width_percent)
+        config.gradient_overlay_image = None
+        config.gradient_overlay_lock = threading.Lock()
+        config.output_encoder = OutputEncoder(self.output_encoder.output_mode, self.output_encoder.palette_colours, self.output_encoder.dither)
+        if progress is not None:
+            config.progress = progress
+        return config
+    def get_es_item_names(self):
+        """
+        Get the panel image name for every folder, in folder order. Worked out once and reused for every folder image.
+        """
+        if self.es_item_names is None:
+            self.es_item_names = []
+            for working_folder_name in self.folders:
+                working_muOS_system_name = self.folder_console_associations[working_folder_name.lower()]
+                # draw the correct panel image in the middle of the screen
+                if os.path.exists(os.path.join(self.panels_dir, f"{working_folder_name.lower()}.png")):
+                    working_es_system_image_name = f"{working_folder_name.lower()}.png"
+                elif os.path.exists(os.path.join(self.panels_dir, f"auto-{working_folder_name.lower()}.png")):
+                    working_es_system_image_name= f"auto-{working_folder_name.lower()}.png"
+                else:
+                    working_es_system_image_name = get_es_system_name(working_folder_name, working_muOS_system_name, self)
+                self.es_item_names.append(working_es_system_image_name)
+        return self.es_item_names
     def update_folders(self, folders):
         self.folders = folders
-        self.folder_console_associations = get_folder_core_associations(self.folders, self.core_info_dir)
+        self.es_item_names = None
+        self.folder_console_associations = get_folder_core_associations(self.folders, self.core_info_dir, self.catalogue_index)
+        self.catalogue_index.save()
+
+class CatalogueIndex(object):
+    """
+    Persistent index of ROM folder emptiness and core.cfg system names.
+    Entries are revalidated with a single stat by comparing modification times, so unchanged folders and core.cfg files are never reopened.
+    Folders are only trusted to still have entries: directory modification times on FAT/exFAT SD cards are coarse and not always updated,
+    so folders recorded as empty are scanned again, which stops at the first entry.
+    The index is only rewritten when an entry was added, changed or pruned.
+    """
+    def __init__(self, index_path=None):
+        self.index_path = index_path
+        self.folders = {}
+        self.core_associations = {}
+        self.hits = 0
+        self.misses = 0
+        self.changed = False
+        self.seen = set()  # Keys looked up (or found to still exist) this run
+        if index_path is not None:
+            try:
+                index = load_cache(index_path)
+            except (OSError, ValueError):
+                index = {}
+            self.folders = index.get("folders", {})
+            self.core_associations = index.get("core_associations", {})
+    def is_dir_empty(self, directory):
+        directory_key = os.path.abspath(directory)
+        mtime_ns = os.stat(directory).st_mtime_ns
+        self.seen.add(directory_key)
+        entry = self.folders.get(directory_key)
+        if entry is not None and entry["mtime_ns"] == mtime_ns and not entry["empty"]:
+            self.hits += 1
+            return entry["empty"]
+        self.misses += 1
+        empty = is_dir_empty(directory)
+        new_entry = {"mtime_ns": mtime_ns, "empty": empty}
+        if entry != new_entry:
+            self.folders[directory_key] = new_entry
+            self.changed = True
+        return empty
+    def get_core_association(self, core_info_file):
+        try:
+            file_stat = os.stat(core_info_file)
+        except OSError:
+            return "default"
+        if not stat.S_ISREG(file_stat.st_mode):
+            return "default"
+        file_key = os.path.abspath(core_info_file)
+        self.seen.add(file_key)
+        entry = self.core_associations.get(file_key)
+        if entry is not None and entry["mtime_ns"] == file_stat.st_mtime_ns and entry["size"] == file_stat.st_size:
+            self.hits += 1
+            return entry["system_name"]
+        self.misses += 1
+        system_name = read_core_association(core_info_file)
+        self.core_associations[file_key] = {"mtime_ns": file_stat.st_mtime_ns, "size": file_stat.st_size, "system_name": system_name}
+        self.changed = True
+        return system_name
+    def prune(self):
+        """
+        Drop the entries of folders and core.cfg files that no longer exist, so the index doesn't keep growing.
+        Only entries not looked up this run are checked, with one stat each.
+        """
+        for entries, exists in [(self.folders, os.path.isdir), (self.core_associations, os.path.isfile)]:
+            for key in [key for key in entries if key not in self.seen]:
+                if exists(key):
+                    self.seen.add(key)
+                else:
+                    del entries[key]
+                    self.changed = True
+    def save(self):
+        if self.index_path is None:
+            return
+        self.prune()
+        if not self.changed:
+            return
+        try:
+            save_cache({"folders": self.folders, "core_associations": self.core_associations}, self.index_path)
+            self.changed = False
+        except OSError:
+            pass
+    def log_stats(self, logger):
+        logger.info(f"Catalogue index: {self.hits} entries reused, {self.misses} refreshed")
+
+class OutputWriter(object):
+    """
+    Writes output files only when their bytes have changed, saving SD card writes and keeping muOS's image cache valid.
+    The digest of each written file is kept in an index, so an unchanged output is recognised from a single stat rather than re-reading it.
+    The index is only rewritten when a digest was added, changed or pruned.
+    """
+    def __init__(self, index_path=None):
+        self.index_path = index_path
+        self.digests = {}
+        self.lock = threading.Lock()
+        self.changed = False
+        self.seen = set()  # Outputs written or checked (or found to still match) this run
+        if index_path is not None:
+            try:
+                self.digests = load_cache(index_path)
+            except (OSError, ValueError):
+                self.digests = {}
+    def write(self, output_path, data):
+        """
+        Write data to output_path unless the file there already holds exactly these bytes.
+        :return: True if the file was written, False if it was skipped.
+        """
+        output_key = os.path.abspath(output_path)
+        digest = hashlib.sha256(data).hexdigest()
+        try:
+            file_stat = os.stat(output_path)
+        except OSError:
+            file_stat = None
+        if file_stat is not None and file_stat.st_size == len(data):
+            with self.lock:
+                entry = self.digests.get(output_key)
+            if entry is not None and entry["mtime_ns"] == file_stat.st_mtime_ns and entry["size"] == file_stat.st_size:
+                unchanged = entry["sha256"] == digest
+            else:
+                # Not written by us, or changed since, so compare with what is actually there
+                with open(output_path, "rb") as f:
+                    unchanged = f.read() == data
+            if unchanged:
+                self.remember(output_key, file_stat, digest)
+                return False
+        with open(output_path, "wb") as f:
+            f.write(data)
+        self.remember(output_key, os.stat(output_path), digest)
+        return True
+    def remember(self, output_key, file_stat, digest):
+        """Record the digest of an output file as it is now on disk."""
+        entry = {"mtime_ns": file_stat.st_mtime_ns, "size": file_stat.st_size, "sha256": digest}
+        with self.lock:
+            self.seen.add(output_key)
+            if self.digests.get(output_key) != entry:
+                self.digests[output_key] = entry
+                self.changed = True
+    def save_image(self, image, output_path, image_format="PNG"):
+        """Encode an image and write it with write."""
+        return self.write(output_path, encode_image(image, image_format))
+    def prune(self):
+        """
+        Drop the digests of outputs that were deleted or changed by something else, so the index doesn't keep growing.
+        Only outputs not written or checked this run are checked, with one stat each.
+        """
+        with self.lock:
+            unseen = [(key, entry) for key, entry in self.digests.items() if key not in self.seen]
+        for key, entry in unseen:
+            try:
+                file_stat = os.stat(key)
+                still_valid = entry["mtime_ns"] == file_stat.st_mtime_ns and entry["size"] == file_stat.st_size
+            except OSError:
+                still_valid = False
+            with self.lock:
+                if still_valid:
+                    self.seen.add(key)
+                elif self.digests.get(key) is entry:
+                    del self.digests[key]
+                    self.changed = True
+    def save(self):
+        if self.index_path is None:
+            return
+        self.prune()
+        with self.lock:
+            if not self.changed:
+                return
+            digests = dict(self.digests)
+            self.changed = False
+        try:
+            save_cache(digests, self.index_path)
+        except OSError:
+            with self.lock:
+                self.changed = True
+
+class CheckpointJournal(object):
+    """
+    Append-only journal of completed outputs and the fingerprint of the inputs each was made from, so an interrupted run
+    can be resumed without redoing work that is already done and still valid.
+    One JSON object per line, flushed as each output completes. A line cut short by the interruption is ignored.
+    Without resume the previous journal is replaced, on the first record, since that run won't be continued.
+    """
+    def __init__(self, journal_path=None, resume=False):
+        self.journal_path = journal_path
+        self.resume = resume
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.stream = None
+        if journal_path is not None and resume:
+            try:
+                with open(journal_path, "r", encoding="utf-8") as file:
+                    for line in file:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            continue
+                        if isinstance(entry, dict) and "key" in entry:
+                            self.entries[entry["key"]] = entry
+            except OSError:
+                pass
+    @property
+    def enabled(self):
+        """Whether there is a journal file to resume from or record to."""
+        return self.journal_path is not None
+    def get(self, key, fingerprint, output_path=None):
+        """
+        Get the journal entry for an output if it was completed from inputs with this fingerprint.
+        :param output_path: If set, the file must also still be the one that was recorded.
+        :return: Entry dictionary, or None if the output needs redoing.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry is None or entry.get("fingerprint") != fingerprint:
+            return None
+        if output_path is not None:
+            try:
+                file_stat = os.stat(output_path)
+            except OSError:
+                return None
+            if [file_stat.st_size, file_stat.st_mtime_ns] != entry.get("file"):
+                return None
+        return entry
+    def record(self, key, fingerprint, output_path=None, **details):
+        """
+        Record that an output is complete.
+        :param output_path: If set, the file's size and modification time are recorded to check it later.
+        :param details: Anything else to keep in the entry, JSON serialisable.
+        """
+        entry = {"key": key, "fingerprint": fingerprint, **details}
+        if output_path is not None:
+            file_stat = os.stat(output_path)
+            entry["file"] = [file_stat.st_size, file_stat.st_mtime_ns]
+        with self.lock:
+            self.entries[key] = entry
+            if self.journal_path is None:
+                return
+            if self.stream is None:
+                self.stream = open(self.journal_path, "a" if self.resume else "w", encoding="utf-8")
+                # An interrupted write can leave a partial last line, don't let it swallow the first new entry
+                if self.resume and self.stream.tell() > 0:
+                    self.stream.write("\n")
+            self.stream.write(json.dumps(entry) + "\n")
+            self.stream.flush()
+    def close(self):
+        with self.lock:
+            if self.stream is not None:
+                self.stream.flush()
+                os.fsync(self.stream.fileno())
+                self.stream.close()
+                self.stream = None
+
+class StartupReport(object):
+    """
+    Times the steps of starting up, for --startup_report.
+    Steps up to the first frame are marked in order, assets that are only loaded when a stage first needs them are added as they load.
+    """
+    def __init__(self, start_time):
+        self.start_time = start_time
+        self.last_mark_time = start_time
+        self.steps = []
+        self.deferred_steps = []
+        self.lock = threading.Lock()
+    def mark(self, step):
+        """Record the time since the previous mark as step."""
+        now = time.perf_counter()
+        with self.lock:
+            self.steps.append((step, now-self.last_mark_time))
+            self.last_mark_time = now
+    def add(self, step, seconds):
+        """Record a deferred load that took seconds."""
+        with self.lock:
+            self.deferred_steps.append((step, seconds))
+    def log(self, logger):
+        with self.lock:
+            steps = list(self.steps)
+            deferred_steps = list(self.deferred_steps)
+            startup_seconds = self.last_mark_time-self.start_time
+        logger.info(f"Startup took {startup_seconds*1000:.0f}ms:")
+        for step, seconds in steps:
+            logger.info(f"  {step}: {seconds*1000:.1f}ms")
+        if deferred_steps:
+            logger.info("Loaded when first needed:")
+            for step, seconds in deferred_steps:
+                logger.info(f"  {step}: {seconds*1000:.1f}ms")
+
+startup_report = StartupReport(startup_time)
+
+class OutputEncoder(object):
+    """
+    Encodes box art frames as PNG in one of the output modes:
+    rgba keeps the frame as it is, rgb drops the alpha channel of frames that are fully opaque,
+    and palette quantises frames to an adaptive palette of up to palette_colours colours.
+    The first few frames are also encoded as RGBA, to report how much smaller and quicker the chosen mode is.
+    """
+    def __init__(self, output_mode="rgba", palette_colours=256, dither=True, reference_frames=5):
+        self.output_mode = output_mode
+        self.palette_colours = palette_colours
+        self.dither = dither
+        self.reference_frames = reference_frames
+        self.lock = threading.Lock()
+        self.frames = 0
+        self.total_bytes = 0
+        self.total_encode_time = 0
+        self.reference_frames_measured = 0
+        self.reference_frames_taken = 0
+        self.reference_bytes = [0, 0]  # Mode bytes, RGBA bytes for the sampled frames
+        self.reference_encode_time = [0, 0]
+    def convert(self, image):
+        """Convert a frame to the output mode."""
+        if self.output_mode == "rgba" or image.mode != "RGBA":
+            return image
+        opaque = image.getchannel("A").getextrema() == (255, 255)
+        if self.output_mode == "rgb":
+            return image.convert("RGB") if opaque else image
+        dither = Image.Dither.FLOYDSTEINBERG if self.dither else Image.Dither.NONE
+        if opaque:
+            return image.convert("RGB").quantize(colors=self.palette_colours, method=Image.Quantize.MEDIANCUT, dither=dither)
+        # Median cut can't quantise alpha, octree can
+        return image.quantize(colors=self.palette_colours, method=Image.Quantize.FASTOCTREE, dither=dither)
+    def encode(self, image):
+        """
+        Encode a frame as PNG in the output mode.
+        :return: PNG bytes.
+        """
+        start_time = time.perf_counter()
+        data = encode_image(self.convert(image))
+        encode_time = time.perf_counter()-start_time
+        with self.lock:
+            measure_reference = self.output_mode != "rgba" and self.reference_frames_measured < self.reference_frames
+            if measure_reference:
+                self.reference_frames_measured += 1
+        if measure_reference:
+            start_time = time.perf_counter()
+            reference_data = encode_image(image)
+            reference_encode_time = time.perf_counter()-start_time
+        with self.lock:
+            self.frames += 1
+            self.total_bytes += len(data)
+            self.total_encode_time += encode_time
+            if measure_reference:
+                self.reference_bytes[0] += len(data)
+                self.reference_bytes[1] += len(reference_data)
+                self.reference_encode_time[0] += encode_time
+                self.reference_encode_time[1] += reference_encode_time
+        return data
+    def take_stats(self):
+        """Get the counters for the frames encoded so far and reset them, so another process can add them with add_stats."""
+        with self.lock:
+            # Only the reference frame count keeps counting, so no more than reference_frames are ever measured
+            stats = (self.frames, self.total_bytes, self.total_encode_time, self.reference_frames_measured-self.reference_frames_taken,
+                     self.reference_bytes, self.reference_encode_time)
+            self.frames, self.total_bytes, self.total_encode_time = 0, 0, 0
+            self.reference_frames_taken = self.reference_frames_measured
+            self.reference_bytes, self.reference_encode_time = [0, 0], [0, 0]
+        return stats
+    def add_stats(self, stats):
+        """Add counters from take_stats to this encoder's."""
+        frames, total_bytes, total_encode_time, reference_frames_measured, reference_bytes, reference_encode_time = stats
+        with self.lock:
+            self.frames += frames
+            self.total_bytes += total_bytes
+            self.total_encode_time += total_encode_time
+            self.reference_frames_measured += reference_frames_measured
+            self.reference_bytes = [a+b for a, b in zip(self.reference_bytes, reference_bytes)]
+            self.reference_encode_time = [a+b for a, b in zip(self.reference_encode_time, reference_encode_time)]
+    def log_stats(self, logger):
+        if self.frames == 0:
+            return
+        logger.info(f"Output mode {self.output_mode}: {self.frames} frames, {self.total_bytes/1024:.0f} KiB, {self.total_encode_time*1000/self.frames:.1f} ms per frame to encode")
+        if self.reference_frames_measured and self.reference_bytes[1] and self.reference_encode_time[1]:
+            size_change = 100*(self.reference_bytes[0]/self.reference_bytes[1]-1)
+            time_change = 100*(self.reference_encode_time[0]/self.reference_encode_time[1]-1)
+            logger.info(f"  Compared with RGBA over {self.reference_frames_measured} frames: files {abs(size_change):.0f}% {'smaller' if size_change <= 0 else 'larger'}, "
+                        f"encoding {abs(time_change):.0f}% {'faster' if time_change <= 0 else 'slower'}")
 
 def generateGradientImage(width, height, start_colour, end_colour, gradient_height_percent,config:Config):
     """
@@ -203,8 +1270,7 @@ def generateGradientImage(width, height, start_colour, end_colour, gradient_heig
             a = int(start_colour[3] + t * delta_a)
 
             # Draw a horizontal line with the calculated colour
-            for x in range(width):
-                gradient.putpixel((x, y), (r, g, b, a))
+            gradient.paste((r, g, b, a), (0, y, width, y+1))
 
     return gradient
 
@@ -216,26 +1282,16 @@ def generateFolderImage(folder_name:str, config:Config):
     :param config: Configuration object.
     :return: Image object.
     """
-    config.logger.info(f"Generating Image for {folder_name}")
+    config.logger.debug(f"Generating Image for {folder_name}")
     height_multiplier = config.panel_height/config.screen_height
     width_multiplier = config.panel_width/config.screen_width
     rendered_image_multiplier = max(height_multiplier, width_multiplier)
     rendered_image_width, rendered_image_height = int(config.screen_width*rendered_image_multiplier), int(config.screen_height*rendered_image_multiplier)
-    image = Image.new("RGBA", (rendered_image_width, rendered_image_height), config.background_hex)
+    image = config.canvas_pool.borrow((rendered_image_width, rendered_image_height), config.background_hex)
 
     muOS_system_name = config.folder_console_associations[folder_name.lower()]
 
-    all_es_item_names = []
-    for working_folder_name in config.folders:
-        working_muOS_system_name = config.folder_console_associations[working_folder_name.lower()]
-        # draw the correct panel image in the middle of the screen
-        if os.path.exists(os.path.join(config.panels_dir, f"{working_folder_name.lower()}.png")):
-            working_es_system_image_name = f"{working_folder_name.lower()}.png"
-        elif os.path.exists(os.path.join(config.panels_dir, f"auto-{working_folder_name.lower()}.png")):
-            working_es_system_image_name= f"auto-{working_folder_name.lower()}.png"
-        else:
-            working_es_system_image_name = get_es_system_name(working_folder_name, working_muOS_system_name, config)
-        all_es_item_names.append(working_es_system_image_name)
+    all_es_item_names = config.get_es_item_names()
 
     combinedPanelImage = generateArtBookNextImage(config.folders.index(folder_name),
                                                   all_es_item_names,
@@ -248,11 +1304,12 @@ def generateFolderImage(folder_name:str, config:Config):
                                                   config.panel_width,
                                                   config.panel_height,
                                                   config.deselected_brightness,
-                                                  config.selected_brightness)
-    image.alpha_composite(combinedPanelImage, (0,0))
-    
+                                                  config.selected_brightness,
+                                                  config.panel_image_cache,
+                                                  config.source_image_cache,
+                                                  config.compositor,
+                                                  config.canvas_pool)
     gradient = config.get_gradient_overlay_image(image.width,image.height,(0,0,0,config.gradient_intensity),(0,0,0,0),0.75)
-    image.alpha_composite(gradient,(0,0))
 
     if check_for_special_case(folder_name, config.special_cases) != None:
         special_muOS_system_name = check_for_special_case(folder_name, config.special_cases)
@@ -265,7 +1322,10 @@ def generateFolderImage(folder_name:str, config:Config):
                                        int(config.max_icon_height*rendered_image_multiplier),
                                        int(config.max_icon_width*rendered_image_multiplier),
                                        config.stylish_font_path,
-                                       config.shadow_strength)
+                                       config.shadow_strength,
+                                       config.logo_image_cache,
+                                       config.canvas_pool,
+                                       config.source_image_cache)
     else:
         logo_image = generateLogoImage(folder_name,
                                        muOS_system_name,
@@ -276,10 +1336,19 @@ def generateFolderImage(folder_name:str, config:Config):
                                        int(config.max_icon_height*rendered_image_multiplier),
                                        int(config.max_icon_width*rendered_image_multiplier),
                                        config.stylish_font_path,
-                                       config.shadow_strength)
-    image.alpha_composite(logo_image, (0,0))
-
-    return(image.resize((config.screen_width, config.screen_height), Image.LANCZOS))
+                                       config.shadow_strength,
+                                       config.logo_image_cache,
+                                       config.canvas_pool,
+                                       config.source_image_cache)
+    config.compositor.composite(image, [(combinedPanelImage, (0,0)), (gradient, (0,0)), (logo_image, (0,0))])
+
+    folder_image = image.resize((config.screen_width, config.screen_height), Image.LANCZOS)
+    config.canvas_pool.release(image)
+    config.canvas_pool.release(combinedPanelImage)
+    if config.logo_image_cache is None:
+        # Cached logos are shared between frames, only a freshly drawn one can go back to the pool
+        config.canvas_pool.release(logo_image)
+    return(folder_image)
 
 def generateMenuImage(index, menu_names, es_system_images, config:Config):
     """
@@ -288,12 +1357,12 @@ def generateMenuImage(index, menu_names, es_system_images, config:Config):
     :param config: Configuration object.
     :return: Image object.
     """
-    config.logger.info(f"Generating Menu Image for {menu_names[index]}")
+    config.logger.debug(f"Generating Menu Image for {menu_names[index]}")
     height_multiplier = config.panel_height/config.screen_height
     width_multiplier = config.panel_width/config.screen_width
     rendered_image_multiplier = max(height_multiplier, width_multiplier)
     rendered_image_width, rendered_image_height = int(config.screen_width*rendered_image_multiplier), int(config.screen_height*rendered_image_multiplier)
-    image = Image.new("RGBA", (rendered_image_width, rendered_image_height), config.background_hex)
+    image = config.canvas_pool.borrow((rendered_image_width, rendered_image_height), config.background_hex)
 
     combinedPanelImage = generateArtBookNextImage(index,
                                                   es_system_images,
@@ -306,36 +1375,93 @@ def generateMenuImage(index, menu_names, es_system_images, config:Config):
                                                   config.panel_width,
                                                   config.panel_height,
                                                   config.deselected_brightness,
-                                                  config.selected_brightness)
-    image.alpha_composite(combinedPanelImage, (0,0))
-    
+                                                  config.selected_brightness,
+                                                  config.panel_image_cache,
+                                                  config.source_image_cache,
+                                                  config.compositor,
+                                                  config.canvas_pool)
     gradient = config.get_gradient_overlay_image(image.width,image.height,(0,0,0,config.gradient_intensity),(0,0,0,0),0.75)
-    image.alpha_composite(gradient,(0,0))
+    config.compositor.composite(image, [(combinedPanelImage, (0,0)), (gradient, (0,0))])
+
+    menu_image = image.resize((config.screen_width, config.screen_height), Image.LANCZOS)
+    config.canvas_pool.release(image)
+    config.canvas_pool.release(combinedPanelImage)
+    return(menu_image)
+
+MUXLAUNCH_IMAGES = {
+    "explore": "auto-allgames.png",
+    "favourite": "auto-favorites.png",
+    "history": "auto-lastplayed.png",
+    "apps": "library.png",
+    "info": "pyxel.png",
+    "config": "tools.png",
+    "reboot": "sufami.png",
+    "shutdown": "completed.png"
+}
+
+THEME_PARTS = ["menu_images", "boot_screens", "fonts", "glyphs", "scheme_files"]
+
+# Where in the theme folder each part writes its files
+THEME_PART_PATHS = {
+    "menu_images": ["image/static/muxlaunch/", "preview.png"],
+    "boot_screens": ["image/wall/", "image/shutdown.png", "image/reboot.png", "image/bootlogo.bmp"],
+    "fonts": ["font/"],
+    "glyphs": ["glyph/"],
+    "scheme_files": ["scheme/"],
+}
+
+def get_theme_part(relative_path):
+    """Get the entry of THEME_PARTS that writes a "/" separated path in the theme folder, or None."""
+    for part, part_paths in THEME_PART_PATHS.items():
+        for part_path in part_paths:
+            if relative_path == part_path or (part_path.endswith("/") and relative_path.startswith(part_path)):
+                return part
+    return None
 
-    return(image.resize((config.screen_width, config.screen_height), Image.LANCZOS))
+def fillThemePart(part, theme_folder_dir, glyph_assets_folder, template_scheme_file_path, lv_font_conv, ranges_file, cache_file, help_off, config:Config, glyph_sizes=None):
+    """
+    Generate one part of the theme into the theme folder.
+    :param part: Entry of THEME_PARTS.
+    :param glyph_sizes: Glyph sizes from the glyphs part, used by the scheme files part.
+    :return: Glyph sizes for the glyphs part, otherwise None.
+    """
+    if part == "menu_images":
+        config.progress.start_stage("theme_menu_images", len(MUXLAUNCH_IMAGES))
+        fillMenuImages(theme_folder_dir, config)
+    elif part == "boot_screens":
+        config.progress.start_stage("theme_boot_screens", 6)
+        fillBootScreens(theme_folder_dir, config)
+    elif part == "fonts":
+        config.progress.start_stage("theme_fonts")
+        fillFontFolder(os.path.join(theme_folder_dir, "font"),
+                       config.stylish_font_path,
+                       config.font_path,
+                       lv_font_conv,
+                       ranges_file,
+                       cache_file,
+                       config)
+    elif part == "glyphs":
+        config.progress.start_stage("theme_glyphs")
+        glyph_sizes = fillThemeGlyphs(theme_folder_dir, glyph_assets_folder, config)
+    elif part == "scheme_files":
+        config.progress.start_stage("theme_scheme_files")
+        fillSchemeFiles(os.path.join(theme_folder_dir, "scheme"), template_scheme_file_path, help_off, config, glyph_sizes=glyph_sizes)
+    else:
+        raise ValueError(f"Unknown theme part: {part}")
+    config.progress.finish_stage()
+    return glyph_sizes if part == "glyphs" else None
 
-def fillTempThemeFolder(theme_folder_dir, glyph_assets_folder, template_scheme_file_path, lv_font_conv, ranges_file, cache_file, help_off, config:Config):
+def fillMenuImages(theme_folder_dir, config:Config):
     """
-    Generate a folder image for the given folder name. In the style of Art Book Next.
-    :param folder_name: Name of the folder.
+    Generate the muxlaunch menu images and the theme preview.
+    :param theme_folder_dir: Theme folder to write the images into.
     :param config: Configuration object.
-    :return: Image object.
     """
-    config.logger.info(f"Generating Theme Images")
-
-    muxlaunch_images = {
-            "explore": "auto-allgames.png",
-            "favourite": "auto-favorites.png",
-            "history": "auto-lastplayed.png",
-            "apps": "library.png",
-            "info": "pyxel.png",
-            "config": "tools.png",
-            "reboot": "sufami.png",
-            "shutdown": "completed.png"
-        }
+    muxlaunch_images = MUXLAUNCH_IMAGES
     muxlaunch_image_dir = os.path.join(theme_folder_dir, "image", "static", "muxlaunch")
     os.makedirs(muxlaunch_image_dir, exist_ok=True)
     for index, (item, image) in enumerate(muxlaunch_images.items()):
+        config.governor.pause()
         current_theme_image = generateMenuImage(index, list(muxlaunch_images.keys()), list(muxlaunch_images.values()), config)
         current_theme_image.save(os.path.join(muxlaunch_image_dir, f"{item}.png"))
         if index == 0:
@@ -356,11 +1482,19 @@ def fillTempThemeFolder(theme_folder_dir, glyph_assets_folder, template_scheme_f
             current_theme_image.alpha_composite(logo, (0,0))
             current_theme_image.save(os.path.join(theme_folder_dir, "preview.png"))
         config.logger.info(f"Successfully generated theme image for system: {item}")
+        config.progress.item_finished(item)
 
+def fillBootScreens(theme_folder_dir, config:Config):
+    """
+    Generate the wallpaper, charging, loading, shutdown, reboot and boot logo screens.
+    :param theme_folder_dir: Theme folder to write the images into.
+    :param config: Configuration object.
+    """
     os.makedirs(os.path.join(theme_folder_dir,"image","wall"), exist_ok=True)
 
     defaultimage = generatePilImageDefaultScreen(config.background_hex[1:],config.screen_width,config.screen_height)
     defaultimage.save(os.path.join(theme_folder_dir,"image","wall","default.png"), format='PNG')
+    config.progress.item_finished("default")
 
     chargingimage = generatePilImageBootScreen(config.background_hex[1:],
                                                "ffffff",
@@ -369,6 +1503,7 @@ def fillTempThemeFolder(theme_folder_dir, glyph_assets_folder, template_scheme_f
                                                config.screen_height,
                                                config.stylish_font_path)
     chargingimage.save(os.path.join(theme_folder_dir,"image","wall","muxcharge.png"), format='PNG')
+    config.progress.item_finished("muxcharge")
 
     loadingimage = generatePilImageBootScreen(config.background_hex[1:],
                                               "ffffff",
@@ -377,6 +1512,7 @@ def fillTempThemeFolder(theme_folder_dir, glyph_assets_folder, template_scheme_f
                                               config.screen_height,
                                               config.stylish_font_path)
     loadingimage.save(os.path.join(theme_folder_dir,"image","wall","muxstart.png"), format='PNG')
+    config.progress.item_finished("muxstart")
 
     shutdownimage = generatePilImageBootScreen(config.background_hex[1:],
                                                "ffffff",
@@ -385,6 +1521,7 @@ def fillTempThemeFolder(theme_folder_dir, glyph_assets_folder, template_scheme_f
                                                config.screen_height,
                                                config.stylish_font_path)
     shutdownimage.save(os.path.join(theme_folder_dir,"image","shutdown.png"), format='PNG')
+    config.progress.item_finished("shutdown")
 
     rebootimage = generatePilImageBootScreen(config.background_hex[1:],
                                              "ffffff",
@@ -393,6 +1530,7 @@ def fillTempThemeFolder(theme_folder_dir, glyph_assets_folder, template_scheme_f
                                              config.screen_height,
                                              config.stylish_font_path)
     rebootimage.save(os.path.join(theme_folder_dir,"image","reboot.png"), format='PNG')
+    config.progress.item_finished("reboot")
 
     bootlogoimage = generatePilImageBootScreen(config.background_hex[1:],
                                                "ffffff",
@@ -401,14 +1539,16 @@ def fillTempThemeFolder(theme_folder_dir, glyph_assets_folder, template_scheme_f
                                                config.screen_height,
                                                config.stylish_font_path)
     bootlogoimage.save(os.path.join(theme_folder_dir,"image","bootlogo.bmp"), format='BMP')
+    config.progress.item_finished("bootlogo")
 
-    fillFontFolder(os.path.join(theme_folder_dir, "font"),
-                   config.stylish_font_path,
-                   config.font_path,
-                   lv_font_conv,
-                   ranges_file,
-                   cache_file,
-                   config)
+def fillThemeGlyphs(theme_folder_dir, glyph_assets_folder, config:Config):
+    """
+    Generate the header and footer glyphs at the theme's screen size.
+    :param theme_folder_dir: Theme folder to write the glyphs into.
+    :param glyph_assets_folder: Folder of the 5x glyph assets.
+    :param config: Configuration object.
+    :return: Glyph sizes as returned by fillGlyphFolder.
+    """
     footer_height = int((55/480)*config.screen_height)
     header_height = int((60/480)*config.screen_height)
     output_glyph_folder = os.path.join(theme_folder_dir,"glyph")
@@ -446,25 +1586,39 @@ def fillTempThemeFolder(theme_folder_dir, glyph_assets_folder, template_scheme_f
         'network_active.png':[1000,16],
         'network_normal.png':[1000,16]
     }
-    fillGlyphFolder(footer_height, header_height, glyph_assets_folder, output_glyph_folder, footer_glyph_bbox_map_640p, header_glyph_bbox_map_640p, config)
+    return fillGlyphFolder(footer_height, header_height, glyph_assets_folder, output_glyph_folder, footer_glyph_bbox_map_640p, header_glyph_bbox_map_640p, config)
 
-    fillSchemeFiles(os.path.join(theme_folder_dir, "scheme"), template_scheme_file_path, help_off, config)
+glyph_cache_index_lock = threading.Lock()
 
 def fillGlyphFolder(footer_height, header_height, glyph_folder_5x, output_glyph_folder, footer_glyph_bbox_map_640p, header_glyph_bbox_map_640p, config:Config):
+    """
+    Resize the 5x header and footer glyphs into the theme's glyph folder.
+    Resized glyphs are cached in the working directory by source hash and target bbox, so unchanged glyphs are just copied.
+    :return: Dictionary of {folder: {glyph: (width, height)}} for every glyph written.
+    """
+    glyph_cache_dir = os.path.join(config.working_dir, ".glyph_cache")
+    os.makedirs(glyph_cache_dir, exist_ok=True)
+    file_hash_index_path = get_file_hash_index_path(config.working_dir)
+    load_file_hash_index(file_hash_index_path)
+    glyph_cache_index_path = os.path.join(glyph_cache_dir, "index.json")
+    try:
+        glyph_cache_index = load_cache(glyph_cache_index_path)
+    except ValueError:
+        glyph_cache_index = {}
+
     glyph_folders = os.listdir(glyph_folder_5x)
     valid_folders = ["header", "footer"]
-    glyphs = []
+    glyph_jobs = []
     for folder in glyph_folders:
         if not os.path.isdir(os.path.join(glyph_folder_5x, folder)):
             continue
         if not folder in valid_folders:
             continue
+        os.makedirs(os.path.join(output_glyph_folder, folder), exist_ok=True)
         glyphs_in_folder = os.listdir(os.path.join(glyph_folder_5x, folder))
         for glyph in glyphs_in_folder:
             if not glyph[-4:] == ".png":
                 continue
-            glyph_image = Image.open(os.path.join(glyph_folder_5x, folder, glyph))
-            glyphs.append(glyph)
             if folder == "footer":
                 current_bbox = footer_glyph_bbox_map_640p.get(glyph, [20,20])
                 scaled_bbox = current_bbox[0]*footer_height/55, current_bbox[1]*footer_height/55
@@ -473,21 +1627,58 @@ def fillGlyphFolder(footer_height, header_height, glyph_folder_5x, output_glyph_
                 scaled_bbox = current_bbox[0]*header_height/60, current_bbox[1]*header_height/60
             else:
                 raise ValueError
-            
-            print("Scaled_bbox = ", scaled_bbox)
-            glyph_image = resize_fit_bbox(glyph_image, scaled_bbox[0], scaled_bbox[1])
-            os.makedirs(os.path.join(output_glyph_folder, folder), exist_ok=True)
-            glyph_image.save(os.path.join(output_glyph_folder, folder, glyph))
-    print(sorted(glyphs))
-
-def get_status_size(temp_glyph_folder, between_padding):
-    battery_glyph_image = Image.open(os.path.join(temp_glyph_folder, "header", "capacity_100.png"))
-    network_glyph_image = Image.open(os.path.join(temp_glyph_folder, "header", "network_normal.png"))
-    status_size = battery_glyph_image.width+between_padding+network_glyph_image.width
+            glyph_jobs.append((folder, glyph, scaled_bbox))
+
+    def resizeGlyph(folder, glyph, scaled_bbox):
+        source_path = os.path.join(glyph_folder_5x, folder, glyph)
+        output_path = os.path.join(output_glyph_folder, folder, glyph)
+        cache_key = hashlib.sha256(f"{get_file_hash(source_path)}|{scaled_bbox[0]!r}|{scaled_bbox[1]!r}".encode()).hexdigest()
+        cache_path = os.path.join(glyph_cache_dir, f"{cache_key}.png")
+        if cache_key in glyph_cache_index and os.path.isfile(cache_path):
+            shutil.copy2(cache_path, output_path)
+            return cache_key, tuple(glyph_cache_index[cache_key]), True
+        glyph_image = resize_fit_bbox(Image.open(source_path), scaled_bbox[0], scaled_bbox[1])
+        glyph_image.save(output_path)
+        temporary_cache_path = get_temporary_path(cache_path)
+        shutil.copy2(output_path, temporary_cache_path)
+        os.replace(temporary_cache_path, cache_path)
+        return cache_key, glyph_image.size, False
+
+    glyph_sizes = {folder: {} for folder in valid_folders}
+    new_glyph_cache_entries = {}
+    cached_glyph_count = 0
+    with ThreadPoolExecutor(max_workers=config.governor.get_workers(os.cpu_count() or 1, "glyph resizing")) as executor:
+        futures = {executor.submit(resizeGlyph, folder, glyph, scaled_bbox): (folder, glyph) for folder, glyph, scaled_bbox in glyph_jobs}
+        for future in as_completed(futures):
+            folder, glyph = futures[future]
+            cache_key, glyph_size, from_cache = future.result()
+            glyph_sizes[folder][glyph] = glyph_size
+            new_glyph_cache_entries[cache_key] = list(glyph_size)
+            if from_cache:
+                cached_glyph_count += 1
+
+    # Other screen sizes can be resizing glyphs at the same time, so merge into whatever is on disk now rather than overwrite it
+    with glyph_cache_index_lock:
+        try:
+            glyph_cache_index = load_cache(glyph_cache_index_path)
+        except ValueError:
+            glyph_cache_index = {}
+        glyph_cache_index.update(new_glyph_cache_entries)
+        save_cache(glyph_cache_index, glyph_cache_index_path)
+    save_file_hash_index(file_hash_index_path)
+    config.logger.info(f"Generated {len(glyph_jobs)} glyphs ({cached_glyph_count} from cache)")
+    return glyph_sizes
+
+def get_status_size(temp_glyph_folder, between_padding, glyph_sizes=None):
+    if glyph_sizes is not None:
+        battery_glyph_width = glyph_sizes["header"]["capacity_100.png"][0]
+        network_glyph_width = glyph_sizes["header"]["network_normal.png"][0]
+    else:
+        battery_glyph_width = Image.open(os.path.join(temp_glyph_folder, "header", "capacity_100.png")).width
+        network_glyph_width = Image.open(os.path.join(temp_glyph_folder, "header", "network_normal.png")).width
+    status_size = battery_glyph_width+between_padding+network_glyph_width
     return(status_size)
 
-    
-
 def resize_fit_bbox(image:Image, max_width, max_height):
     image_multiplier = min(max_width/image.width, max_height/image.height)
     return(image.resize((int(image.width*image_multiplier), int(image.height*image_multiplier)), Image.LANCZOS))
@@ -525,58 +1716,139 @@ def fillFontFolder(font_folder_dir, stylish_font_path, font_path, lv_font_conv,
     )
     font_size["panel"]["muxlaunch"] = scaled_font_size
 
+    font_jobs = []
     for folder in font_size.keys():
         for font in font_size[folder].keys():
             font_size_int = int(font_size[folder][font])
             font_name = f"{font}.bin"
             output_file = os.path.join(font_folder_dir, folder, font_name)
             current_font_path = font_path if font_style[folder][font] == "normal" else stylish_font_path
-            generateFontBinary(current_font_path,
-                               lv_font_conv,
-                               font_size_int,
-                               output_file,
-                               ranges_file,
-                               cache_file,
-                               config.logger)
+            font_jobs.append((current_font_path, font_size_int, output_file))
     default_font_size = 20
     font_name = f"default.bin"
     output_file = os.path.join(font_folder_dir, font_name)
-    generateFontBinary(font_path,
-                        lv_font_conv,
-                        default_font_size,
-                        output_file,
-                        ranges_file,
-                        cache_file,
-                        config.logger)
-
-def generateFontBinary(font_path, lv_font_conv, font_size, output_path, ranges_file, cache_file, logger):
+    font_jobs.append((font_path, default_font_size, output_file))
+
+    generateFontBinaries(font_jobs,
+                         lv_font_conv,
+                         ranges_file,
+                         cache_file,
+                         config.logger,
+                         max_workers=config.governor.get_workers(os.cpu_count() or 1, "lv_font_conv"),
+                         binary_cache_dir=os.path.join(config.working_dir, ".font_binary_cache"),
+                         file_hash_index_path=get_file_hash_index_path(config.working_dir))
+
+supported_ranges_lock = threading.Lock()  # Stops several theme builds checking (and caching) the same font at once
+
+def generateFontBinaries(font_jobs, lv_font_conv, ranges_file, cache_file, logger, max_workers=None, binary_cache_dir=None,
+                         file_hash_index_path=None):
+    """
+    Generate several font binaries at once, running each unique lv_font_conv job only once.
+    :param font_jobs: List of (font_path, font_size, output_path) tuples.
+    :param lv_font_conv: Path to the lv_font_conv binary.
+    :param ranges_file: Path to the unicode ranges file.
+    :param cache_file: Path to the supported ranges cache file.
+    :param logger: Logger instance.
+    :param max_workers: Maximum number of lv_font_conv processes to run at once (default: CPU count).
+    :param binary_cache_dir: Directory of previously generated binaries, keyed by a hash of their inputs (default: no cache).
+    :param file_hash_index_path: File hash index to reuse font hashes from, see get_file_hash_index_path (default: hash the fonts every run).
+    """
+    if binary_cache_dir is not None:
+        os.makedirs(binary_cache_dir, exist_ok=True)
+    if file_hash_index_path is not None:
+        load_file_hash_index(file_hash_index_path)
+
     ranges = parse_ranges_file(ranges_file)
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
-    supported_ranges = check_supported_ranges(font_path, ranges, cache_file, lv_font_conv)
-    if not supported_ranges:
-        print("No supported ranges found for the font.")
+    # Work out supported ranges once per font, before any jobs run, so the cache file is only written from here
+    supported_ranges_by_font = {}
+    with supported_ranges_lock:
+        for current_font_path, _, _ in font_jobs:
+            if current_font_path not in supported_ranges_by_font:
+                supported_ranges_by_font[current_font_path] = check_supported_ranges(current_font_path, ranges, cache_file, lv_font_conv)
+
+    # Group identical (font, size, ranges) jobs so each one is only converted once
+    unique_jobs = {}
+    for current_font_path, font_size, output_path in font_jobs:
+        supported_ranges = supported_ranges_by_font[current_font_path]
+        if not supported_ranges:
+            logger.error(f"No supported ranges found for the font: {current_font_path}")
+            continue
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        job_key = (os.path.realpath(current_font_path), font_size, ",".join(supported_ranges.keys()))
+        unique_jobs.setdefault(job_key, []).append(output_path)
+
+    # Copy anything we have already generated with the same inputs straight out of the cache
+    if binary_cache_dir is not None:
+        uncached_jobs = {}
+        cache_paths = {}
+        for job_key, output_paths in unique_jobs.items():
+            current_font_path, font_size, ranges_string = job_key
+            cache_path = os.path.join(binary_cache_dir, f"{get_font_binary_cache_key(current_font_path, font_size, ranges_string, lv_font_conv)}.bin")
+            if os.path.isfile(cache_path):
+                for output_path in output_paths:
+                    shutil.copy2(cache_path, output_path)
+                logger.info(f"Using cached font binary for size {font_size} -> {', '.join(output_paths)}")
+            else:
+                uncached_jobs[job_key] = output_paths
+                cache_paths[job_key] = cache_path
+        unique_jobs = uncached_jobs
+    if file_hash_index_path is not None:
+        save_file_hash_index(file_hash_index_path)
+
+    if not unique_jobs:
         return
-    print("Supported ranges:")
-    for unicode_range, block_name in supported_ranges.items():
-        print(f"{unicode_range} ({block_name})")
-    
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(unique_jobs)))
+    logger.info(f"Generating {len(unique_jobs)} unique font binaries for {len(font_jobs)} outputs using {max_workers} worker(s)")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for job_key, output_paths in unique_jobs.items():
+            current_font_path, font_size, ranges_string = job_key
+            future = executor.submit(runLvFontConv, lv_font_conv, current_font_path, font_size, ranges_string, output_paths[0], logger)
+            futures[future] = job_key
+        for future in as_completed(futures):
+            output_paths = unique_jobs[futures[future]]
+            if not future.result():
+                continue
+            if binary_cache_dir is not None:
+                # Write to a temporary name first so an interrupted run never leaves a partial binary in the cache
+                cache_path = cache_paths[futures[future]]
+                temporary_cache_path = get_temporary_path(cache_path)
+                shutil.copy2(output_paths[0], temporary_cache_path)
+                os.replace(temporary_cache_path, cache_path)
+            for duplicate_output_path in output_paths[1:]:
+                shutil.copy2(output_paths[0], duplicate_output_path)
+                logger.info(f"Copied font binary {output_paths[0]} -> {duplicate_output_path}")
+
+def runLvFontConv(lv_font_conv, font_path, font_size, ranges_string, output_path, logger):
+    """
+    Run a single lv_font_conv job.
+    :return: True if the font binary was generated, False otherwise.
+    """
     command = [
        lv_font_conv,
         "--bpp", "4",
         "--size", f"{font_size}",
         "--font", font_path,
-        "-r", ",".join(supported_ranges.keys()),
+        "-r", ranges_string,
         "--format", "bin",
         "--no-compress",
         "--no-prefilter",
         "-o", output_path,
     ]
-    print(f"Generating font binary for size {font_size} -> {output_path}")
+    logger.debug(f"Generating font binary for size {font_size} -> {output_path}")
     try:
-        subprocess.run(command, check=True)
+        result = subprocess.run(command, check=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
     except subprocess.CalledProcessError as e:
-        print(f"Error generating font binary for size {font_size}: {e}")
+        logger.error(f"Error generating font binary for size {font_size}: {e}\n{e.stdout.decode('utf-8', errors='replace')}")
+        return False
+    if result.stdout:
+        logger.debug(result.stdout.decode("utf-8", errors="replace"))
+    return True
 
 def parse_ranges_file(file_path):
     """Parse ranges.txt and return a dictionary of ranges and block names."""
@@ -602,33 +1874,30 @@ def parse_ranges_file(file_path):
 def check_supported_ranges(font_path, ranges, cache_file, lv_font_conv_binary):
     """Check supported ranges for the font, using cache if available."""
     cache = load_cache(cache_file)
-    font_hash = calculate_file_hash(font_path)
+    font_hash = get_file_hash(font_path)
 
     # Check if the font's hash is already in the cache
     if font_hash in cache:
-        print(f"Using cached ranges for font: {font_path}")
+        module_logger.info(f"Using cached ranges for font: {font_path}")
         return cache[font_hash]["supported_ranges"]
 
-    # Test ranges with lv_font_conv
-    print(f"Checking supported ranges for font: {font_path}")
-    supported_ranges = {}
-    for unicode_range, block_name in ranges.items():
-        try:
-            command = [
-                lv_font_conv_binary,
-                "--bpp", "4",
-                "--size", "20",  # Arbitrary size for testing ranges
-                "--font", font_path,
-                "-r", unicode_range,
-                "--format", "bin",
-                "--no-compress",
-                "--no-prefilter",
-                "-o", os.devnull,  # Discard output
-            ]
-            subprocess.run(command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            supported_ranges[unicode_range] = block_name
-        except subprocess.CalledProcessError:
-            print(f"Font does not support range: {unicode_range} ({block_name})")
+    module_logger.info(f"Checking supported ranges for font: {font_path}")
+    codepoint_intervals = get_font_codepoint_intervals(font_path)
+    if codepoint_intervals is not None:
+        # Read the coverage straight out of the font's cmap table
+        interval_starts = [interval[0] for interval in codepoint_intervals]
+        supported_ranges = {}
+        for unicode_range, block_name in ranges.items():
+            range_start, range_end = (int(n, 16) for n in unicode_range.split("-"))
+            if interval_overlaps(codepoint_intervals, interval_starts, range_start, range_end):
+                supported_ranges[unicode_range] = block_name
+            else:
+                module_logger.debug(f"Font does not support range: {unicode_range} ({block_name})")
+    else:
+        # Couldn't read the cmap table, fall back to asking lv_font_conv
+        supported_ranges = probe_supported_ranges(font_path, ranges, lv_font_conv_binary)
+
+    module_logger.info(f"Font supports {len(supported_ranges)} of {len(ranges)} unicode ranges: {font_path}")
 
     # Save the result to the cache
     cache[font_hash] = {
@@ -639,6 +1908,171 @@ def check_supported_ranges(font_path, ranges, cache_file, lv_font_conv_binary):
 
     return supported_ranges
 
+def probe_supported_ranges(font_path, ranges, lv_font_conv_binary):
+    """
+    Find the ranges lv_font_conv accepts for a font by testing batches of ranges,
+    bisecting any batch that fails until the unsupported ranges are found.
+    :param font_path: Path to the font file.
+    :param ranges: Dictionary of unicode ranges and block names.
+    :param lv_font_conv_binary: Path to the lv_font_conv binary.
+    :return: Dictionary of supported unicode ranges and block names.
+    """
+    def test_ranges(unicode_ranges):
+        command = [
+            lv_font_conv_binary,
+            "--bpp", "4",
+            "--size", "20",  # Arbitrary size for testing ranges
+            "--font", font_path,
+            "-r", ",".join(unicode_ranges),
+            "--format", "bin",
+            "--no-compress",
+            "--no-prefilter",
+            "-o", os.devnull,  # Discard output
+        ]
+        result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        return result.returncode == 0, result.stderr.decode("utf-8", errors="replace")
+
+    def find_reported_range(error_output, unicode_ranges):
+        # lv_font_conv names the range it gave up on, e.g. "doesn't have any characters included in range 0x3000-0x303F"
+        for match in re.finditer(r"0x([0-9A-Fa-f]+)-0x([0-9A-Fa-f]+)", error_output):
+            reported_range = f"0x{int(match.group(1), 16):04X}-0x{int(match.group(2), 16):04X}"
+            if reported_range in unicode_ranges:
+                return reported_range
+        return None
+
+    supported_ranges = {}
+    batches = [list(ranges.keys())]
+    while batches:
+        batch = batches.pop()
+        if not batch:
+            continue
+        batch_supported, error_output = test_ranges(batch)
+        if batch_supported:
+            for unicode_range in batch:
+                supported_ranges[unicode_range] = ranges[unicode_range]
+            continue
+        reported_range = batch[0] if len(batch) == 1 else find_reported_range(error_output, batch)
+        if reported_range is not None:
+            module_logger.debug(f"Font does not support range: {reported_range} ({ranges[reported_range]})")
+            batches.append([unicode_range for unicode_range in batch if unicode_range != reported_range])
+        else:
+            middle = len(batch) // 2
+            batches.append(batch[middle:])
+            batches.append(batch[:middle])
+
+    # Keep the same ordering as the ranges file
+    return {unicode_range: ranges[unicode_range] for unicode_range in ranges if unicode_range in supported_ranges}
+
+def interval_overlaps(intervals, interval_starts, range_start, range_end):
+    """
+    Check if any of a sorted list of non-overlapping (start, end) intervals overlaps range_start..range_end.
+    :param interval_starts: The start of each interval, used to bisect into the list.
+    """
+    index = bisect.bisect_right(interval_starts, range_end) - 1
+    return index >= 0 and intervals[index][1] >= range_start
+
+def get_font_codepoint_intervals(font_path):
+    """
+    Read the unicode codepoints a font has glyphs for from its cmap table.
+    :param font_path: Path to a TrueType/OpenType font (or the first font of a collection).
+    :return: Sorted list of merged (start, end) codepoint intervals, or None if the cmap couldn't be read.
+    """
+    try:
+        with open(font_path, "rb") as f:
+            data = f.read()
+
+        font_offset = 0
+        if data[:4] == b"ttcf":
+            font_offset = struct.unpack_from(">I", data, 12)[0]
+        num_tables = struct.unpack_from(">H", data, font_offset + 4)[0]
+        cmap_offset = None
+        for table_index in range(num_tables):
+            record_offset = font_offset + 12 + table_index * 16
+            tag, _, table_offset, _ = struct.unpack_from(">4sIII", data, record_offset)
+            if tag == b"cmap":
+                cmap_offset = table_offset
+                break
+        if cmap_offset is None:
+            return None
+
+        intervals = []
+        found_unicode_subtable = False
+        num_subtables = struct.unpack_from(">H", data, cmap_offset + 2)[0]
+        for subtable_index in range(num_subtables):
+            platform_id, encoding_id, subtable_offset = struct.unpack_from(">HHI", data, cmap_offset + 4 + subtable_index * 8)
+            # Only unicode subtables: platform 0, or Windows (3) unicode BMP (1) / full (10)
+            if not (platform_id == 0 or (platform_id == 3 and encoding_id in (1, 10))):
+                continue
+            subtable_offset += cmap_offset
+            subtable_format = struct.unpack_from(">H", data, subtable_offset)[0]
+            if subtable_format == 4:
+                intervals.extend(read_cmap_format_4(data, subtable_offset))
+            elif subtable_format in (12, 13):
+                intervals.extend(read_cmap_format_12(data, subtable_offset, subtable_format))
+            else:
+                continue
+            found_unicode_subtable = True
+        if not found_unicode_subtable:
+            return None
+    except (OSError, struct.error):
+        return None
+
+    merged_intervals = []
+    for interval_start, interval_end in sorted(intervals):
+        if merged_intervals and interval_start <= merged_intervals[-1][1] + 1:
+            merged_intervals[-1][1] = max(merged_intervals[-1][1], interval_end)
+        else:
+            merged_intervals.append([interval_start, interval_end])
+    return [tuple(interval) for interval in merged_intervals]
+
+def read_cmap_format_4(data, offset):
+    """Read the (start, end) codepoint intervals that map to a real glyph from a format 4 cmap subtable."""
+    seg_count = struct.unpack_from(">H", data, offset + 6)[0] // 2
+    end_codes_offset = offset + 14
+    start_codes_offset = end_codes_offset + seg_count * 2 + 2
+    id_deltas_offset = start_codes_offset + seg_count * 2
+    id_range_offsets_offset = id_deltas_offset + seg_count * 2
+
+    intervals = []
+    for segment in range(seg_count):
+        end_code = struct.unpack_from(">H", data, end_codes_offset + segment * 2)[0]
+        start_code = struct.unpack_from(">H", data, start_codes_offset + segment * 2)[0]
+        id_delta = struct.unpack_from(">h", data, id_deltas_offset + segment * 2)[0]
+        id_range_offset_position = id_range_offsets_offset + segment * 2
+        id_range_offset = struct.unpack_from(">H", data, id_range_offset_position)[0]
+        if start_code == 0xFFFF:
+            continue
+        run_start = None
+        for codepoint in range(start_code, end_code + 1):
+            if id_range_offset == 0:
+                glyph_id = (codepoint + id_delta) & 0xFFFF
+            else:
+                glyph_id = struct.unpack_from(">H", data, id_range_offset_position + id_range_offset + (codepoint - start_code) * 2)[0]
+                if glyph_id != 0:
+                    glyph_id = (glyph_id + id_delta) & 0xFFFF
+            if glyph_id != 0 and run_start is None:
+                run_start = codepoint
+            elif glyph_id == 0 and run_start is not None:
+                intervals.append((run_start, codepoint - 1))
+                run_start = None
+        if run_start is not None:
+            intervals.append((run_start, end_code))
+    return intervals
+
+def read_cmap_format_12(data, offset, subtable_format):
+    """Read the (start, end) codepoint intervals that map to a real glyph from a format 12 or 13 cmap subtable."""
+    num_groups = struct.unpack_from(">I", data, offset + 12)[0]
+    intervals = []
+    for group in range(num_groups):
+        start_code, end_code, start_glyph_id = struct.unpack_from(">III", data, offset + 16 + group * 12)
+        if start_glyph_id == 0:
+            # Format 12 maps consecutive glyphs so only the first codepoint hits .notdef, format 13 maps them all to it
+            if subtable_format == 13 or start_code == end_code:
+                continue
+            start_code += 1
+        intervals.append((start_code, end_code))
+    return intervals
+
 def load_cache(cache_file):
     """Load the font ranges cache from a JSON file."""
     if os.path.exists(cache_file):
@@ -646,10 +2080,20 @@ def load_cache(cache_file):
             return json.load(f)
     return {}
 
+cache_file_lock = threading.Lock()
+
 def save_cache(cache, cache_file):
     """Save the font ranges cache to a JSON file."""
-    with open(cache_file, "w", encoding="utf-8") as f:
-        json.dump(cache, f, indent=4)
+    # Write to a temporary file and swap it in, so concurrent readers never see a half written file
+    with cache_file_lock:
+        temporary_cache_file = get_temporary_path(cache_file)
+        with open(temporary_cache_file, "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=4)
+        os.replace(temporary_cache_file, cache_file)
+
+def get_temporary_path(path):
+    """Get a temporary path next to path that is unique to this process and thread."""
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
 
 def calculate_file_hash(file_path):
     """Calculate the SHA256 hash of a file."""
@@ -659,6 +2103,123 @@ def calculate_file_hash(file_path):
             hash_sha256.update(chunk)
     return hash_sha256.hexdigest()
 
+file_hash_index = {}
+file_hash_index_lock = threading.Lock()  # Theme parts and box art hash files on different threads
+
+def get_file_hash_index_path(working_dir):
+    """Get the path the file hash index is kept at, one file for everything that hashes inputs."""
+    return os.path.join(working_dir, ".file_hashes.json")
+
+def get_file_hash(file_path):
+    """
+    Get the SHA256 hash of a file, only re-hashing it when its path, size or modification time changes.
+    :param file_path: Path to the file.
+    :return: Hex digest of the file.
+    """
+    file_stat = os.stat(file_path)
+    index_key = f"{os.path.realpath(file_path)}|{file_stat.st_size}|{file_stat.st_mtime_ns}"
+    with file_hash_index_lock:
+        file_hash = file_hash_index.get(index_key)
+    if file_hash is None:
+        file_hash = calculate_file_hash(file_path)
+        with file_hash_index_lock:
+            file_hash_index[index_key] = file_hash
+    return file_hash
+
+def get_program_hash():
+    """
+    Get the hash of the code doing the generating, so outputs are rebuilt when it changes.
+    A PyInstaller build unpacks its modules without main.py on disk, so the executable itself is hashed instead.
+    """
+    if getattr(sys, "frozen", False):
+        return get_file_hash(sys.executable)
+    return get_file_hash(os.path.abspath(__file__))
+
+def load_file_hash_index(index_file):
+    """Merge a previously saved file hash index into the in-memory one."""
+    try:
+        saved_index = load_cache(index_file)
+    except (OSError, ValueError):
+        return
+    with file_hash_index_lock:
+        file_hash_index.update(saved_index)
+
+def save_file_hash_index(index_file):
+    """
+    Save the in-memory file hash index to a JSON file.
+    Entries for files that no longer exist, or whose size or modification time changed, are dropped first, so the index doesn't grow forever.
+    """
+    with file_hash_index_lock:
+        index_keys = list(file_hash_index)
+    stale_keys = []
+    for index_key in index_keys:
+        file_path, file_size, file_mtime_ns = index_key.rsplit("|", 2)
+        try:
+            file_stat = os.stat(file_path)
+        except OSError:
+            file_stat = None
+        if file_stat is None or f"{file_stat.st_size}" != file_size or f"{file_stat.st_mtime_ns}" != file_mtime_ns:
+            stale_keys.append(index_key)
+    # Other threads keep hashing while this one saves, so dump a snapshot rather than the live dictionary
+    with file_hash_index_lock:
+        for index_key in stale_keys:
+            file_hash_index.pop(index_key, None)
+        saved_index = dict(file_hash_index)
+    save_cache(saved_index, index_file)
+
+def get_font_binary_cache_key(font_path, font_size, ranges_string, lv_font_conv):
+    """
+    Get the key a generated font binary is cached under, a hash of everything that affects its contents.
+    :param font_path: Path to the font file.
+    :param font_size: Font size in pixels.
+    :param ranges_string: Comma separated unicode ranges passed to lv_font_conv.
+    :param lv_font_conv: Path to the lv_font_conv binary or "lv_font_conv" if it's in PATH.
+    :return: Hex digest identifying the font binary.
+    """
+    key_source = json.dumps([get_file_hash(font_path), font_size, ranges_string, get_lv_font_conv_id(lv_font_conv)])
+    return hashlib.sha256(key_source.encode()).hexdigest()
+
+def get_lv_font_conv_id(lv_font_conv):
+    """Identify the lv_font_conv binary by its path, size and modification time."""
+    lv_font_conv_path = shutil.which(lv_font_conv) or lv_font_conv
+    try:
+        lv_font_conv_stat = os.stat(lv_font_conv_path)
+        return f"{os.path.realpath(lv_font_conv_path)}|{lv_font_conv_stat.st_size}|{lv_font_conv_stat.st_mtime_ns}"
+    except OSError:
+        return lv_font_conv
+
+def get_directory_hash(directory):
+    """
+    Get a hash of every file in a directory, along with their relative paths.
+    :param directory: Directory to hash.
+    :return: Hex digest of the directory contents.
+    """
+    hash_sha256 = hashlib.sha256()
+    for relative_path in sorted(snapshot_files(directory)):
+        hash_sha256.update(f"{relative_path}|{get_file_hash(os.path.join(directory, relative_path))}\n".encode())
+    return hash_sha256.hexdigest()
+
+def get_fingerprint(*values):
+    """Get a hash of some JSON serialisable values."""
+    return hashlib.sha256(json.dumps(values).encode()).hexdigest()
+
+def snapshot_files(directory):
+    """
+    Get the size and modification time of every file in a directory.
+    :return: Dictionary of "/" separated relative path to (size, modification time) tuple.
+    """
+    files = {}
+    for root, dirs, file_names in os.walk(directory):
+        for file_name in file_names:
+            file_path = os.path.join(root, file_name)
+            file_stat = os.stat(file_path)
+            files[os.path.relpath(file_path, directory).replace(os.sep, "/")] = (file_stat.st_size, file_stat.st_mtime_ns)
+    return files
+
+def get_changed_files(directory, files_before):
+    """Get the files in a directory that were added or modified since files_before was taken with snapshot_files."""
+    return sorted(path for path, file_info in snapshot_files(directory).items() if files_before.get(path) != file_info)
+
 def percentage_colour(hex1, hex2, percentage):
     # Convert hex colours to RGB
     rgb1 = hex_to_rgb(hex1)
@@ -690,9 +2251,9 @@ def round_to_nearest_odd(number):
 
 def is_dir_empty(directory):
     with os.scandir(directory) as entries:
-        return not any(entries)  # Returns False if there's at least one entry
+        return next(entries, None) is None  # Stops at the first entry
 
-def fillSchemeFiles(scheme_files_dir, template_scheme_file_path, help_off, config:Config):
+def fillSchemeFiles(scheme_files_dir, template_scheme_file_path, help_off, config:Config, glyph_sizes=None):
     os.makedirs(scheme_files_dir, exist_ok=True)
 
     stringsToReplace = []
@@ -741,7 +2302,7 @@ def fillSchemeFiles(scheme_files_dir, template_scheme_file_path, help_off, confi
     # Get the parent directory
     parent_path = os.path.dirname(normalized_path.rstrip('/'))
 
-    status_size = get_status_size(os.path.join(parent_path, "glyph"), 5)
+    status_size = get_status_size(os.path.join(parent_path, "glyph"), 5, glyph_sizes)
 
     clock_padding = header_icon_padding+status_size+header_icon_padding
     
@@ -901,6 +2462,12 @@ def fillSchemeFiles(scheme_files_dir, template_scheme_file_path, help_off, confi
             replacement = replacementStringMap[fileName].get(stringToBeReplaced,replacementStringMap["default"][stringToBeReplaced])
             replace_in_file(os.path.join(scheme_files_dir,f"{fileName}.txt"), stringToBeReplaced, str(replacement))
 
+def loadSourceImage(image_path):
+    """Decode an image fully, so the copy can be shared between threads."""
+    image = Image.open(image_path)
+    image.load()
+    return image
+
 def generateArtBookNextImage(current_index,
                              all_es_item_names,
                              rendered_image_width,
@@ -912,21 +2479,43 @@ def generateArtBookNextImage(current_index,
                              panel_width,
                              panel_height,
                              deselected_brightness,
-                             selected_brightness):
-    image = Image.new("RGBA", (rendered_image_width, rendered_image_height), (0,0,0,0))
+                             selected_brightness,
+                             panel_image_cache=None,
+                             source_image_cache=None,
+                             compositor=None,
+                             canvas_pool=None):
+    compositor = compositor or PilCompositor()
+    if canvas_pool is None:
+        image = Image.new("RGBA", (rendered_image_width, rendered_image_height), (0,0,0,0))
+    else:
+        image = canvas_pool.borrow((rendered_image_width, rendered_image_height))
+    panel_layers = []
+
+    def loadPanelImage(es_item_name, brightness):
+        def load():
+            panel_path = os.path.join(panels_dir, f"{es_item_name}")
+            if source_image_cache is None:
+                source_image = Image.open(panel_path)
+            else:
+                # Decode each panel once and scale every screen size's copy from it
+                source_image = source_image_cache.get(panel_path, lambda: loadSourceImage(panel_path))
+            panel_image = source_image.resize((panel_width, panel_height), Image.LANCZOS)
+            panel_image = compositor.brighten(panel_image, brightness)
+            return set_layer_bbox(panel_image, panel_image.getbbox())
+        if panel_image_cache is None:
+            return load()
+        # Neighbouring folders share most of their panels, so keep recently used ones decoded
+        return panel_image_cache.get((panels_dir, es_item_name, panel_width, panel_height, brightness), load)
 
     change_in_x = int(real_panel_width+(gap_between_panels*(rendered_image_multiplier)))
 
     panels_per_screen = ceil(rendered_image_width/change_in_x)+1
 
     current_es_item_name = all_es_item_names[current_index]
-    panel_image = Image.open(os.path.join(panels_dir, f"{current_es_item_name}")).resize((panel_width, panel_height), Image.LANCZOS)
-
-    enhancer = ImageEnhance.Brightness(panel_image)
-    panel_image = enhancer.enhance(selected_brightness)
+    panel_image = loadPanelImage(current_es_item_name, selected_brightness)
 
     image_middle_x = int((rendered_image_width - panel_image.width) / 2)
-    image.alpha_composite(panel_image, (image_middle_x, 0))
+    panel_layers.append((panel_image, (image_middle_x, 0)))
     panels_left = panels_per_screen-1
     panels_to_the_left = ceil(panels_left/2)
     panels_to_the_right = ceil(panels_left/2)
@@ -936,11 +2525,9 @@ def generateArtBookNextImage(current_index,
         working_item_index = (current_index+index)%len(all_es_item_names)
 
         working_es_item_name = all_es_item_names[working_item_index]
-        working_panel_image = Image.open(os.path.join(panels_dir, f"{working_es_item_name}")).resize((panel_width, panel_height), Image.LANCZOS)
-        enhancer = ImageEnhance.Brightness(working_panel_image)
         # to reduce brightness by 50%, use factor 0.5
-        working_panel_image = enhancer.enhance(deselected_brightness)
-        image.alpha_composite(working_panel_image, (image_middle_x+index*change_in_x, 0))
+        working_panel_image = loadPanelImage(working_es_item_name, deselected_brightness)
+        panel_layers.append((working_panel_image, (image_middle_x+index*change_in_x, 0)))
         index += 1
     index=1
     while index <= panels_to_the_right:
@@ -948,17 +2535,22 @@ def generateArtBookNextImage(current_index,
         working_item_index = (current_index-index)%len(all_es_item_names)
 
         working_es_item_name = all_es_item_names[working_item_index]
-        working_panel_image = Image.open(os.path.join(panels_dir, f"{working_es_item_name}")).resize((panel_width, panel_height), Image.LANCZOS)
-
-        enhancer = ImageEnhance.Brightness(working_panel_image)
         # to reduce brightness by 50%, use factor 0.5
-        working_panel_image = enhancer.enhance(deselected_brightness)
-        image.alpha_composite(working_panel_image, (image_middle_x-index*change_in_x, 0))
+        working_panel_image = loadPanelImage(working_es_item_name, deselected_brightness)
+        panel_layers.append((working_panel_image, (image_middle_x-index*change_in_x, 0)))
         index += 1
-    return(image)
+    compositor.composite(image, panel_layers)
+    # Panels only cover a band of the canvas, remember where so the frame composite can skip the rest
+    panel_boxes = []
+    for layer, (x, y) in panel_layers:
+        layer_bbox = get_layer_bbox(layer)
+        if layer_bbox is not None:
+            panel_boxes.append((x+layer_bbox[0], y+layer_bbox[1], x+layer_bbox[2], y+layer_bbox[3]))
+    return(set_layer_bbox(image, union_bbox(panel_boxes, image.size)))
 
 
 def generatePilImageBootScreen(base_hex, accent_hex, display_text, screen_width, screen_height, font_path, icon_path=None):
+    from PIL import ImageDraw, ImageFont, ImageOps
     base_rgb = hex_to_rgb(base_hex)
     image = Image.new("RGBA", (screen_width, screen_height), base_rgb)
     draw = ImageDraw.Draw(image)
@@ -1041,6 +2633,77 @@ def check_for_special_case(folder_name, special_cases):
     return None
 
 
+text_font_cache = {}
+text_font_cache_lock = threading.Lock()
+
+def load_text_font(font_path, font_size):
+    """
+    Load a font for drawing text logos, keeping it and the widths measured with it for the next logo.
+    :return: (font, dictionary of text to measured width) tuple.
+    """
+    with text_font_cache_lock:
+        if (font_path, font_size) not in text_font_cache:
+            from PIL import ImageFont
+            text_font_cache[(font_path, font_size)] = (ImageFont.truetype(font_path, font_size), {})
+        return text_font_cache[(font_path, font_size)]
+
+def layout_text(text, font, max_width, line_spacing, word_widths=None):
+    """
+    Break text into centred lines no wider than max_width, measuring words with font.getlength and their ink with font.getbbox.
+    Words are fitted greedily, and a word too wide for a line of its own is split where a binary search finds it stops fitting.
+    :param text: Text to lay out.
+    :param font: PIL font to measure with.
+    :param max_width: Maximum line width in pixels.
+    :param line_spacing: Extra pixels between lines, may be negative.
+    :param word_widths: Optional dictionary of text to measurements, reused between calls with the same font.
+    :return: (list of (line, x, y) tuples, block width, block height) tuple.
+    """
+    if word_widths is None:
+        word_widths = {}
+    def measure(word):
+        # Advance width plus where the ink starts and ends, slanted fonts draw past their advance
+        if word not in word_widths:
+            word_bbox = font.getbbox(word)
+            word_widths[word] = (font.getlength(word), word_bbox[0], word_bbox[2])
+        return word_widths[word]
+    def ink_width(word):
+        _, ink_left, ink_right = measure(word)
+        return ink_right-ink_left
+
+    space_advance = measure(" ")[0]
+    lines = []
+    line_words, line_advance, line_ink_left = [], 0, 0
+    for word in text.split(" "):
+        word_advance, word_ink_left, word_ink_right = measure(word)
+        if line_words and line_advance + space_advance + word_ink_right - line_ink_left <= max_width:
+            line_words.append(word)
+            line_advance += space_advance + word_advance
+            continue
+        if line_words:
+            lines.append(" ".join(line_words))
+        while ink_width(word) > max_width and len(word) > 1:
+            # Longest prefix that fits, always keeping at least one character so the loop moves on
+            low, high = 1, len(word)-1
+            while low < high:
+                middle = (low+high+1)//2
+                if ink_width(word[:middle]) <= max_width:
+                    low = middle
+                else:
+                    high = middle-1
+            lines.append(word[:low])
+            word = word[low:]
+        line_words, line_advance, line_ink_left = [word], measure(word)[0], measure(word)[1]
+
+    lines.append(" ".join(line_words))
+
+    ascent, descent = font.getmetrics()
+    line_height = ascent + descent
+    line_widths = [ink_width(line) for line in lines]
+    block_width = max(line_widths)
+    positioned_lines = [(line, (block_width-line_width)/2, index*(line_height+line_spacing))
+                        for index, (line, line_width) in enumerate(zip(lines, line_widths))]
+    return positioned_lines, block_width, line_height*len(lines)+(len(lines)-1)*line_spacing
+
 def generateLogoImage(folder_name:str,
                       muOS_system_name:str,
                       image_width:int,
@@ -1050,12 +2713,36 @@ def generateLogoImage(folder_name:str,
                       max_icon_height,
                       max_icon_width,
                       font_path,
-                      shadow_strength):
-    image = Image.new("RGBA", (image_width, image_height), (0, 0, 0, 0))
+                      shadow_strength,
+                      logo_image_cache=None,
+                      canvas_pool=None,
+                      source_image_cache=None):
+    if logo_image_cache is not None:
+        logo_key = (folder_name if muOS_system_name == "default" else None, muOS_system_name, image_width, image_height, logos_dir, max_icon_height, max_icon_width, font_path, shadow_strength)
+        return logo_image_cache.get(logo_key, lambda: generateLogoImage(folder_name,
+                                                                        muOS_system_name,
+                                                                        image_width,
+                                                                        image_height,
+                                                                        logger,
+                                                                        logos_dir,
+                                                                        max_icon_height,
+                                                                        max_icon_width,
+                                                                        font_path,
+                                                                        shadow_strength,
+                                                                        source_image_cache=source_image_cache))
+    from PIL import ImageDraw, ImageFilter, ImageOps
+    if canvas_pool is None:
+        image = Image.new("RGBA", (image_width, image_height), (0, 0, 0, 0))
+    else:
+        image = canvas_pool.borrow((image_width, image_height))
     ## draw the logo in the middle of the screen
-    logger.info(f"Generating logo for {folder_name}")
+    logger.debug(f"Generating logo for {folder_name}")
     if muOS_system_name != "default":
-        logo_image = Image.open(os.path.join(logos_dir, f"{muOS_system_name}.png")).convert("RGBA")
+        logo_path = os.path.join(logos_dir, f"{muOS_system_name}.png")
+        if source_image_cache is None:
+            logo_image = Image.open(logo_path).convert("RGBA")
+        else:
+            logo_image = source_image_cache.get(logo_path, lambda: Image.open(logo_path).convert("RGBA"))
         logo_image_multiplier = min(max_icon_height/logo_image.height, max_icon_width/logo_image.width)
         logo_image = logo_image.resize((int(logo_image.width*logo_image_multiplier), int(logo_image.height*logo_image_multiplier)), Image.LANCZOS)
     else:
@@ -1064,79 +2751,40 @@ def generateLogoImage(folder_name:str,
         font_size_h = 150*(image_height/810)
         font_size = min(font_size_w, font_size_h)
 
-        font = ImageFont.truetype(font_path, font_size)
-
-        folder_name_bbox = font.getbbox(folder_name)
-        folder_name_width = folder_name_bbox[2]-folder_name_bbox[0]
-        folder_name_height = folder_name_bbox[3]-folder_name_bbox[1]
-
-        text_to_draw = []
-        max_chars = floor(len(folder_name)*((max_icon_width)/(folder_name_width)))
-        if len(folder_name) > max_chars:
-            words_in_folder_name = folder_name.split(" ")
-            set_of_words = []
-            index=0
-            while True:
-                if index >= len(words_in_folder_name):
-                    break
-                set_of_words.append(words_in_folder_name[index])
-                sub_index = index+1
-                while True:
-                    if sub_index >= len(words_in_folder_name):
-                        break
-                    if len(set_of_words[index]+" "+words_in_folder_name[sub_index]) > max_chars:
-                        break
-                    set_of_words[index] += " "+words_in_folder_name[sub_index]
-                    words_in_folder_name.remove(words_in_folder_name[sub_index])
-                index += 1
-            for word in set_of_words:
-                if len(word) > max_chars:
-                    for i in range(0, len(word), max_chars):
-                        if i+max_chars > len(word):
-                            text_to_draw.append(word[i:])
-                            break
-                        else:
-                            text_to_draw.append(word[i:i+max_chars])
-                else:
-                    text_to_draw.append(word)
-        else:
-            text_to_draw = [folder_name]
-        text_widths = []
-        ascent, descent = font.getmetrics()
-        text_height = ascent + descent
-        for text in text_to_draw:
-            text_widths.append(font.getbbox(text)[2]-font.getbbox(text)[0])
+        font, word_widths = load_text_font(font_path, font_size)
         space_between_text = int(-30*(image_width/1440))
-        total_text_height = text_height*len(text_to_draw)+ (len(text_to_draw)-1)*space_between_text
+        text_lines, text_block_width, text_block_height = layout_text(folder_name, font, max_icon_width, space_between_text, word_widths)
 
-        logo_image = Image.new("RGBA", (max(text_widths), total_text_height), (0, 0, 0, 0))
+        logo_image = Image.new("RGBA", (text_block_width, text_block_height), (0, 0, 0, 0))
         draw = ImageDraw.Draw(logo_image)
-
-        for n in range(len(text_to_draw)):
-            if n == 0:
-                text_y = 0
-            else:
-                text_y = text_y + text_height + space_between_text
-            text_x = (max(text_widths)-text_widths[n])/2
-            draw.text((text_x,text_y), text_to_draw[n], font=font, fill=(255,255,255,255))
+        for text, text_x, text_y in text_lines:
+            draw.text((text_x,text_y), text, font=font, fill=(255,255,255,255))
         
     logo_image_middle_x = int((image_width - logo_image.width) / 2)
     logo_image_middle_y = int((image_height - logo_image.height) / 2)
 
     # Prepare shadow
-    shadow = Image.new("RGBA", image.size, (0, 0, 0, 0))  # Transparent canvas
+    # The blur can't spread the shadow further than three passes of its radius, so only the area around the logo
+    # needs blurring, and it is the only part of the layer that isn't transparent
+    shadow_blur_radius = 20
+    shadow_margin = 3*(shadow_blur_radius+1)
+    shadow_box = union_bbox([(logo_image_middle_x-shadow_margin,
+                              logo_image_middle_y-shadow_margin,
+                              logo_image_middle_x+logo_image.width+shadow_margin,
+                              logo_image_middle_y+logo_image.height+shadow_margin)], image.size)
+    shadow = Image.new("RGBA", (shadow_box[2]-shadow_box[0], shadow_box[3]-shadow_box[1]), (0, 0, 0, 0))  # Transparent canvas
     alpha_channel = logo_image.split()[3]  # Extract the alpha channel of the logo
     shadow_logo = ImageOps.colorize(alpha_channel, black="black", white="black")  # Create a black shadow
     shadow_logo = shadow_logo.convert("RGBA")  # Ensure RGBA mode
-    shadow.paste(shadow_logo, (logo_image_middle_x, logo_image_middle_y), alpha_channel)  # Use alpha_channel as mask for transparency
-    shadow = shadow.filter(ImageFilter.GaussianBlur(radius=20))
+    shadow.paste(shadow_logo, (logo_image_middle_x-shadow_box[0], logo_image_middle_y-shadow_box[1]), alpha_channel)  # Use alpha_channel as mask for transparency
+    shadow = shadow.filter(ImageFilter.GaussianBlur(radius=shadow_blur_radius))
     for n in range(shadow_strength):
-        image.alpha_composite(shadow, (0,0))
+        image.alpha_composite(shadow, (shadow_box[0], shadow_box[1]))
 
     # Composite logo
     image.alpha_composite(logo_image, (logo_image_middle_x, logo_image_middle_y))
 
-    return image
+    return set_layer_bbox(image, shadow_box)
 
 
 def old_get_folders(roms_dir):
@@ -1154,64 +2802,92 @@ def old_get_folders(roms_dir):
             folder_path = os.path.join(roms_dir, folder)
             if os.path.isdir(folder_path) and not folder.startswith(('.', '_')):
                 if is_dir_empty(folder_path):
-                    print(f"Skipping empty folder: {folder}")
+                    module_logger.info(f"Skipping empty folder: {folder}")
                 else:
                     folders.append(folder)
     except subprocess.CalledProcessError as e:
-        print(f"Error while listing directory: {e}")
+        module_logger.error(f"Error while listing directory: {e}")
     return folders
 
-def get_folders(roms_dir):
+def get_folders(roms_dir, logger=None, catalogue_index=None):
     """
     Get all folders in the ROMs directory, sorted naturally and case-insensitively.
+    Uses a single scandir pass so the file type of each entry comes from the directory listing rather than a separate stat.
 
     :param roms_dir: Path to the ROMs directory.
+    :param logger: Logger to report discovery stats to (default: this module's logger).
+    :param catalogue_index: CatalogueIndex used to remember which folders are empty (default: always check).
     :return: List of folders.
     """
+    from natsort import natsorted
+    logger = logger or module_logger
+    log = logger.info
+    check_dir_empty = catalogue_index.is_dir_empty if catalogue_index is not None else is_dir_empty
+    start_time = time.perf_counter()
     folders = []
+    entry_count = 0
+    empty_count = 0
     try:
-        # List directory contents
-        contents = os.listdir(roms_dir)
-        # Filter and sort folders naturally (case-insensitive)
-        sorted_folders = natsorted(
-            [folder for folder in contents if os.path.isdir(os.path.join(roms_dir, folder)) and not folder.startswith((".", "_"))],
-            key=str.casefold
-        )
-        for folder in sorted_folders:
-            folder_path = os.path.join(roms_dir, folder)
-            if is_dir_empty(folder_path):
-                print(f"Skipping empty folder: {folder}")
+        candidate_entries = []
+        with os.scandir(roms_dir) as entries:
+            for entry in entries:
+                entry_count += 1
+                if entry.name.startswith((".", "_")):
+                    continue
+                try:
+                    if not entry.is_dir():
+                        continue
+                except OSError:
+                    continue
+                candidate_entries.append(entry)
+        # Sort folders naturally (case-insensitive)
+        for entry in natsorted(candidate_entries, key=lambda entry: entry.name.casefold()):
+            if check_dir_empty(entry.path):
+                log(f"Skipping empty folder: {entry.name}")
+                empty_count += 1
             else:
-                folders.append(folder)
+                folders.append(entry.name)
     except OSError as e:
-        print(f"Error while accessing directory: {e}")
+        logger.error(f"Error while accessing directory: {e}")
+    log(f"Discovered {len(folders)} folders in {roms_dir} ({entry_count} entries scanned, {empty_count} empty) in {time.perf_counter()-start_time:.3f}s")
     return folders
 
-def get_folder_core_associations(folders, core_info_dir):
+def get_folder_core_associations(folders, core_info_dir, catalogue_index=None):
     """
     Get folder core associations from the core info directory.
 
-    :param roms_dir: Path to the ROMs directory.
+    :param folders: List of folders.
     :param core_info_dir: Path to the core info directory.
+    :param catalogue_index: CatalogueIndex used to remember each core.cfg's system name (default: always read).
     :return: Dictionary of folder core associations.
     """
     folder_core_associations = {}
     for folder in folders:
         folder = folder.lower()
         core_info_file = os.path.join(core_info_dir, folder, "core.cfg")
-        if os.path.isfile(core_info_file):
-            with open(core_info_file, "r") as f:
-                lines = f.readlines()
-                # Check if the file has at least two lines
-                if len(lines) >= 2:
-                    core_info = lines[1].strip()  # Use strip() to remove any trailing newlines or spaces
-                else:
-                    core_info = "default"  # Handle the case where there are less than 2 lines
-                folder_core_associations[folder] = core_info
+        if catalogue_index is not None:
+            folder_core_associations[folder] = catalogue_index.get_core_association(core_info_file)
+        elif os.path.isfile(core_info_file):
+            folder_core_associations[folder] = read_core_association(core_info_file)
         else:
             folder_core_associations[folder] = "default"
     return folder_core_associations
 
+def read_core_association(core_info_file):
+    """
+    Read the system name from a core.cfg file, which is stored on its second line.
+
+    :param core_info_file: Path to the core.cfg file.
+    :return: System name, or "default" if the file has less than two lines.
+    """
+    with open(core_info_file, "r") as f:
+        f.readline()
+        second_line = f.readline()
+    # Check if the file has at least two lines
+    if not second_line:
+        return "default"
+    return second_line.strip()  # Use strip() to remove any trailing newlines or spaces
+
 def verify_json_mapping(json_file_path, valid_muos_system_names_path, panels_dir, logger):
     """
     Verifies that the JSON file has a mapping for each system image panel.
@@ -1284,24 +2960,904 @@ def validate_file(path, description, logger):
         logger.error(f"[ERROR] {description}: '{path}' is not a valid file.")
         return False
     
-def check_lv_font_conv(lv_font_conv_path):
+def get_lv_font_conv_check_key(lv_font_conv_path):
+    """
+    Get the key a passed lv_font_conv check is cached under.
+    lv_font_conv from npm is a Node script, so the interpreter its #! line names is identified along with the script,
+    and removing or replacing Node invalidates the check.
+    :param lv_font_conv_path: Path to the lv_font_conv binary or "lv_font_conv" if it's in PATH.
+    :return: Key, or None if the binary or its interpreter can't be found and the check shouldn't be cached.
+    """
+    lv_font_conv_id = get_lv_font_conv_id(lv_font_conv_path)
+    if lv_font_conv_id == lv_font_conv_path:
+        return None
+    try:
+        with open(shutil.which(lv_font_conv_path) or lv_font_conv_path, "rb") as file:
+            first_line = file.readline(256)
+    except OSError:
+        return None
+    if not first_line.startswith(b"#!"):
+        return lv_font_conv_id
+    command = first_line[2:].decode("utf-8", "replace").split()
+    if command and os.path.basename(command[0]) == "env":
+        command = [argument for argument in command[1:] if not argument.startswith("-")]
+    interpreter_path = shutil.which(command[0]) if command else None
+    if interpreter_path is None:
+        return None
+    return f"{lv_font_conv_id}|{get_lv_font_conv_id(interpreter_path)}"
+
+def check_lv_font_conv(lv_font_conv_path, cache_path=None):
     """
     Checks if the lv_font_conv tool is available.
     
     :param lv_font_conv_path: Path to the lv_font_conv binary or "lv_font_conv" if it's in PATH.
+    :param cache_path: JSON file remembering binaries that passed, see get_lv_font_conv_check_key, so they aren't run again (default: always run).
     :return: True if lv_font_conv is found and executable, False otherwise.
     """
+    check_key = get_lv_font_conv_check_key(lv_font_conv_path) if cache_path is not None else None
+    if check_key is not None:
+        try:
+            if load_cache(cache_path).get(check_key):
+                return True
+        except (OSError, ValueError):
+            pass
     try:
         # Check if the command is callable
         result = subprocess.run([lv_font_conv_path, "--help"], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         # If the tool is callable and returns help or no error
-        return result.returncode == 0
+        passed = result.returncode == 0
     except Exception as e:
-        print(f"Unexpected error occurred: {e}")
+        module_logger.error(f"Unexpected error occurred: {e}")
         return False
+    if passed and check_key is not None:
+        try:
+            save_cache({check_key: True}, cache_path)
+        except OSError as e:
+            module_logger.warning(f"Couldn't save the lv_font_conv check to {cache_path}: {e}")
+    return passed
+
+class TaskGraph(object):
+    """
+    Runs named tasks on a shared thread pool as soon as the tasks they depend on have finished,
+    then reports the critical path: the chain of dependent tasks that decided the total run time.
+    Each task is called with the dictionary of results of the tasks finished so far.
+    """
+    def __init__(self, logger=None):
+        self.logger = logger
+        self.tasks = {}
+        self.results = {}
+        self.start_times = {}
+        self.finish_times = {}
+        self.run_start_time = None
+    def add(self, name, function, dependencies=()):
+        """
+        Add a task.
+        :param name: Unique task name.
+        :param function: Callable taking the results dictionary, its return value is stored under name.
+        :param dependencies: Names of tasks that must finish first, they must already be added.
+        """
+        if name in self.tasks:
+            raise ValueError(f"Task added twice: {name}")
+        for dependency in dependencies:
+            if dependency not in self.tasks:
+                raise ValueError(f"Task {name} depends on unknown task {dependency}")
+        self.tasks[name] = (function, list(dependencies))
+    def run_task(self, name):
+        self.start_times[name] = time.perf_counter()
+        try:
+            return self.tasks[name][0](self.results)
+        finally:
+            self.finish_times[name] = time.perf_counter()
+    def run(self, max_workers=None):
+        """
+        Run every task, in dependency order, with up to max_workers at once.
+        If a task raises, no new tasks are started and the exception is raised once running tasks have finished.
+        :return: Dictionary of task name to result.
+        """
+        self.run_start_time = time.perf_counter()
+        remaining = dict(self.tasks)
+        running = {}
+        error = None
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while remaining or running:
+                if error is None:
+                    # Tasks are added after their dependencies, so submitting in order keeps earlier ones first
+                    for name, (_, dependencies) in list(remaining.items()):
+                        if all(dependency in self.results for dependency in dependencies):
+                            running[executor.submit(self.run_task, name)] = name
+                            del remaining[name]
+                elif not running:
+                    break
+                if not running:
+                    raise RuntimeError(f"Tasks can never run: {', '.join(remaining)}")
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        self.results[name] = future.result()
+                    except Exception as e:
+                        if error is None:
+                            error = e
+        if error is not None:
+            raise error
+        return self.results
+    def get_critical_path(self):
+        """
+        Get the chain of dependent tasks with the longest total duration.
+        :return: (list of task names, total duration in seconds) tuple.
+        """
+        path_durations = {}
+        previous_task = {}
+        for name, (_, dependencies) in self.tasks.items():
+            if name not in self.finish_times:
+                continue
+            longest_dependency = max((dependency for dependency in dependencies if dependency in path_durations),
+                                     key=lambda dependency: path_durations[dependency], default=None)
+            duration = self.finish_times[name]-self.start_times[name]
+            path_durations[name] = duration + (path_durations[longest_dependency] if longest_dependency else 0)
+            previous_task[name] = longest_dependency
+        if not path_durations:
+            return [], 0
+        name = max(path_durations, key=lambda name: path_durations[name])
+        total_duration = path_durations[name]
+        critical_path = []
+        while name is not None:
+            critical_path.append(name)
+            name = previous_task[name]
+        return list(reversed(critical_path)), total_duration
+    def log_report(self, label=None):
+        if self.logger is None or not self.finish_times:
+            return
+        wall_time = max(self.finish_times.values())-self.run_start_time
+        busy_time = sum(self.finish_times[name]-self.start_times[name] for name in self.finish_times)
+        critical_path, critical_duration = self.get_critical_path()
+        prefix = f"[{label}] " if label else ""
+        for name in sorted(self.finish_times, key=lambda name: self.start_times[name]):
+            self.logger.debug(f"{prefix}Task {name}: started at {self.start_times[name]-self.run_start_time:.1f}s, took {self.finish_times[name]-self.start_times[name]:.1f}s")
+        self.logger.info(f"{prefix}Ran {len(self.finish_times)} tasks in {wall_time:.1f}s ({busy_time:.1f}s of task time)")
+        self.logger.info(f"{prefix}Critical path ({critical_duration:.1f}s): " +
+                         " -> ".join(f"{name} {self.finish_times[name]-self.start_times[name]:.1f}s" for name in critical_path))
+
+GRADIENT_ASSET_KEY = "gradient_overlay"
+render_worker_config = None
+
+def getRenderAssets(config:Config):
+    """
+    Decode every panel and logo the folder images use, keyed the way the renderers look them up in source_image_cache.
+    :param config: Configuration object.
+    :return: Dictionary of key to image.
+    """
+    assets = {}
+    for es_item_name in config.get_es_item_names():
+        panel_path = os.path.join(config.panels_dir, f"{es_item_name}")
+        if panel_path not in assets:
+            assets[panel_path] = loadSourceImage(panel_path)
+    for folder in config.folders:
+        muOS_system_name = check_for_special_case(folder, config.special_cases) or config.folder_console_associations[folder.lower()]
+        logo_path = os.path.join(config.logos_dir, f"{muOS_system_name}.png")
+        if muOS_system_name != "default" and logo_path not in assets:
+            assets[logo_path] = Image.open(logo_path).convert("RGBA")
+    return assets
+
+def initialiseRenderWorker(worker_config:Config, asset_store_index):
+    """
+    Set up a render worker process with the assets shared by the parent.
+    :param worker_config: Configuration object, stripped down by Config.__getstate__.
+    :param asset_store_index: SharedAssetStore index to attach to.
+    """
+    global render_worker_config
+    asset_store = SharedAssetStore.attach(asset_store_index)
+    worker_config.source_image_cache = asset_store
+    gradient_overlay_image = asset_store.get(GRADIENT_ASSET_KEY, lambda: None)
+    if gradient_overlay_image is not None:
+        worker_config.gradient_overlay_image = set_layer_bbox(gradient_overlay_image, gradient_overlay_image.getbbox())
+    render_worker_config = worker_config
+
+def renderFolderInWorker(folder):
+    """
+    Render and encode one folder image in a render worker process.
+    :return: (PNG bytes, encoder stats for OutputEncoder.add_stats)
+    """
+    output_encoder = render_worker_config.output_encoder
+    return output_encoder.encode(generateFolderImage(folder, render_worker_config)), output_encoder.take_stats()
+
+def renderFolders(folders, config:Config):
+    """
+    Render folder images in this process.
+    :return: Generator of (folder, encoded image bytes), in folder order.
+    """
+    for folder in folders:
+        config.governor.pause()
+        yield folder, config.output_encoder.encode(generateFolderImage(folder, config))
+
+def renderFoldersInProcesses(folders, config:Config, processes):
+    """
+    Render folder images on a pool of worker processes that share decoded panels, logos and the gradient through shared memory.
+    :param folders: Folder names to render, at least one.
+    :param config: Configuration object.
+    :param processes: Number of worker processes.
+    :return: Generator of (folder, encoded image bytes), in the order the images finish.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    logger = config.logger
+    # The first folder is rendered here, which also generates the gradient overlay the workers share
+    yield folders[0], config.output_encoder.encode(generateFolderImage(folders[0], config))
+    assets = getRenderAssets(config)
+    assets[GRADIENT_ASSET_KEY] = config.gradient_overlay_image
+    asset_store = SharedAssetStore.create(assets)
+    logger.info(f"Rendering with {processes} worker processes sharing {len(asset_store.entries)} decoded images ({asset_store.block.size/1024/1024:.1f} MiB)")
+    del assets
+    try:
+        # Box art can be running alongside the theme's threads, which a forked worker could inherit mid-operation
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        with ProcessPoolExecutor(max_workers=processes, mp_context=context,
+                                 initializer=initialiseRenderWorker, initargs=(config, asset_store.index)) as executor:
+            # Only keep a couple of frames queued per worker, so governor pauses slow the workers down rather than just the writing
+            remaining_folders = iter(folders[1:])
+            futures = {}
+            def submitNextFolder():
+                folder = next(remaining_folders, None)
+                if folder is not None:
+                    config.governor.pause()
+                    futures[executor.submit(renderFolderInWorker, folder)] = folder
+            for _ in range(processes*2):
+                submitNextFolder()
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    folder = futures.pop(future)
+                    folder_image_data, encoder_stats = future.result()
+                    config.output_encoder.add_stats(encoder_stats)
+                    yield folder, folder_image_data
+                    submitNextFolder()
+    finally:
+        asset_store.close()
+
+def get_box_art_fingerprints(config:Config):
+    """
+    Fingerprint everything each folder's box art is rendered from, for the checkpoint journal.
+    Neighbouring folders' panels appear in every frame, so the folder list and all the panels are part of each fingerprint.
+    :return: Dictionary of folder name to hex digest.
+    """
+    es_item_names = config.get_es_item_names()
+    frame_settings = get_fingerprint(get_program_hash(),
+                                     config.screen_width,
+                                     config.screen_height,
+                                     config.background_hex,
+                                     config.gap_between_panels,
+                                     config.icon_height_percent,
+                                     config.icon_width_percent,
+                                     config.deselected_brightness,
+                                     config.selected_brightness,
+                                     config.shadow_strength,
+                                     config.gradient_intensity,
+                                     config.compositor.name,
+                                     [config.output_encoder.output_mode, config.output_encoder.palette_colours, config.output_encoder.dither],
+                                     config.folders,
+                                     es_item_names,
+                                     {name: get_file_hash(os.path.join(config.panels_dir, name)) for name in sorted(set(es_item_names))},
+                                     get_file_hash(config.stylish_font_path))
+    fingerprints = {}
+    for folder in config.folders:
+        muOS_system_name = check_for_special_case(folder, config.special_cases) or config.folder_console_associations[folder.lower()]
+        logo_path = os.path.join(config.logos_dir, f"{muOS_system_name}.png")
+        logo_hash = get_file_hash(logo_path) if muOS_system_name != "default" and os.path.isfile(logo_path) else None
+        fingerprints[folder] = get_fingerprint(frame_settings, folder, muOS_system_name, logo_hash)
+    return fingerprints
+
+def generateBoxArt(box_art_dir, config:Config):
+    """
+    Generate and save the box art image for every folder.
+    :param box_art_dir: Directory to save the images to.
+    :param config: Configuration object.
+    """
+    logger = config.logger
+    logger.info("Generating folder box art...")
+    # Fingerprinting hashes every panel, only worth it when there is a journal to check the frames against or record them in
+    frame_fingerprints = None
+    if config.journal.enabled:
+        file_hash_index_path = get_file_hash_index_path(config.working_dir)
+        load_file_hash_index(file_hash_index_path)
+        frame_fingerprints = get_box_art_fingerprints(config)
+        save_file_hash_index(file_hash_index_path)
+    output_paths = {folder: os.path.join(box_art_dir, f"{folder}.png") for folder in config.folders}
+    folders = config.folders
+    if frame_fingerprints is not None and config.journal.resume:
+        folders = [folder for folder in config.folders
+                   if config.journal.get(os.path.abspath(output_paths[folder]), frame_fingerprints[folder], output_paths[folder]) is None]
+        if len(folders) < len(config.folders):
+            logger.info(f"Resuming: {len(config.folders)-len(folders)} of {len(config.folders)} folder images are already done")
+    resumed = len(config.folders)-len(folders)
+    config.progress.start_stage("box_art", len(folders))
+    box_art_start_time = time.perf_counter()
+    last_progress_log_time = box_art_start_time
+    written, skipped = 0, 0
+    render_processes = config.governor.get_workers(config.render_processes, "box art rendering") if config.render_processes > 1 else 1
+    if render_processes > 1:
+        # Workers only make up for their start up and for sending frames back when each gets a CPU to itself
+        cpus = config.governor.get_cpus()
+        if render_processes > cpus:
+            logger.info(f"Rendering on {cpus} of {render_processes} worker processes, only {cpus} CPU(s) are available")
+            render_processes = cpus
+    if render_processes > 1 and len(folders) > 1:
+        rendered_folders = renderFoldersInProcesses(folders, config, render_processes)
+    else:
+        rendered_folders = renderFolders(folders, config)
+    for folder_index, (folder, folder_image_data) in enumerate(rendered_folders):
+        if config.output_writer.write(output_paths[folder], folder_image_data):
+            written += 1
+            logger.debug(f"Successfully generated image for folder: {folder}")
+        else:
+            skipped += 1
+            logger.debug(f"Image for folder is unchanged, not rewritten: {folder}")
+        if frame_fingerprints is not None:
+            config.journal.record(os.path.abspath(output_paths[folder]), frame_fingerprints[folder], output_paths[folder])
+        config.progress.item_finished(folder)
+        # Only report progress at INFO every few seconds rather than for every folder
+        if time.perf_counter() - last_progress_log_time >= 5:
+            last_progress_log_time = time.perf_counter()
+            logger.info(f"Generated {folder_index+1}/{len(folders)} folder images")
+    logger.info(f"Generated {len(folders)} folder images in {time.perf_counter()-box_art_start_time:.1f}s")
+    config.output_writer.save()
+    config.output_encoder.log_stats(logger)
+    logger.info(f"Box art files: {written} written, {skipped} unchanged and skipped" + (f", {resumed} done by the interrupted run" if resumed else ""))
+    config.progress.emit("box_art_summary", written=written, skipped=skipped, resumed=resumed)
+    logger.debug(f"Canvas pool: {config.canvas_pool.allocated} canvases allocated, {config.canvas_pool.reused} reuses")
+    config.progress.finish_stage()
+
+def generateTarget(args, config:Config, output_subdir=None):
+    """
+    Generate everything the mode asks for at the config's screen size.
+    :param args: Parsed command line arguments.
+    :param config: Configuration object for this screen size.
+    :param output_subdir: If set, write box art and the theme into this subdirectory of their output directories.
+    """
+    # Box art and the theme parts don't depend on each other, so run them as one task graph on a shared pool.
+    # lv_font_conv and the zip leave the Python side waiting, which rendering can fill.
+    task_graph = TaskGraph(config.logger)
+    if args.mode in ["box_art", "both"]:
+        box_art_dir = args.box_art_dir
+        if output_subdir is not None:
+            box_art_dir = os.path.join(box_art_dir, output_subdir)
+            os.makedirs(box_art_dir, exist_ok=True)
+        task_graph.add("box_art", lambda results: generateBoxArt(box_art_dir, config))
+
+    if args.mode in ["theme", "both"]:
+        theme_output_dir = args.theme_output_dir
+        temp_theme_folder_name = ".temp_theme_folder"
+        if output_subdir is not None:
+            theme_output_dir = os.path.join(theme_output_dir, output_subdir)
+            temp_theme_folder_name = f".temp_theme_folder_{output_subdir}"
+        addThemeTasks(task_graph,
+                      args.working_dir,
+                      args.theme_shell_dir,
+                      args.glyph_assets_dir,
+                      args.template_scheme_path,
+                      args.lv_font_conv_path,
+                      args.font_ranges_path,
+                      args.font_cache_path,
+                      args.help_off,
+                      theme_output_dir,
+                      args.theme_name,
+                      config,
+                      temp_theme_folder_name,
+                      get_theme_variants(args.theme_name, args.theme_variants))
+
+    # Most tasks spend their time in Pillow or lv_font_conv rather than holding the GIL, so every ready task gets a thread
+    task_graph.run(max_workers=len(task_graph.tasks))
+    task_graph.log_report(output_subdir)
+
+# Theme variants that can be built together: help_off and what is added to the theme name
+THEME_VARIANTS = {"help": (False, ""), "no_help": (True, " Hide Help")}
+
+def get_theme_variants(theme_name, variant_names=None):
+    """
+    Get the (theme name, help_off) of each variant to build.
+    :param variant_names: Keys of THEME_VARIANTS, or None to build just the one theme the other options describe.
+    :return: List of (theme name, help_off), or None.
+    """
+    if not variant_names:
+        return None
+    return [(f"{theme_name}{THEME_VARIANTS[name][1]}", THEME_VARIANTS[name][0]) for name in dict.fromkeys(variant_names)]
+
+def parse_screen_size(screen_size):
+    """
+    Parse a screen size given as WIDTHxHEIGHT, e.g. 640x480.
+    :return: (width, height) tuple.
+    """
+    match = re.fullmatch(r"\s*(\d+)\s*[xX×]\s*(\d+)\s*", screen_size)
+    if not match:
+        raise argparse.ArgumentTypeError(f"Invalid screen size '{screen_size}', use WIDTHxHEIGHT e.g. 640x480")
+    return (int(match.group(1)), int(match.group(2)))
+
+def buildTheme(working_dir, theme_shell_dir, glyph_assets_dir, template_scheme_path, lv_font_conv_path, font_ranges_path, font_cache_path, help_off, theme_output_dir, theme_name, config:Config, temp_theme_folder_name=".temp_theme_folder"):
+    """
+    Build the theme in a temporary folder inside the working directory and zip it into the theme output directory.
+    :return: Path to the theme zip.
+    """
+    task_graph = TaskGraph(config.logger)
+    theme_zip_task = addThemeTasks(task_graph, working_dir, theme_shell_dir, glyph_assets_dir, template_scheme_path, lv_font_conv_path, font_ranges_path,
+                                   font_cache_path, help_off, theme_output_dir, theme_name, config, temp_theme_folder_name)
+    task_graph.run(max_workers=1)
+    return task_graph.results[theme_zip_task]
 
-def main():
-    # Define and parse arguments
+def addThemeTasks(task_graph, working_dir, theme_shell_dir, glyph_assets_dir, template_scheme_path, lv_font_conv_path, font_ranges_path, font_cache_path, help_off, theme_output_dir, theme_name, config:Config, temp_theme_folder_name=".temp_theme_folder", variants=None):
+    """
+    Add the steps of building the theme to a task graph: preparing the temporary folder, one task per theme part and zipping.
+    Parts only wait for what they use, so they can run alongside each other and alongside other tasks in the graph.
+    With several variants, the images, fonts and glyphs are generated once and shared, each variant then writes its
+    scheme files and zips the folder in turn.
+    :param variants: List of (theme name, help_off) to build (default: just theme_name with help_off).
+    :return: Name of the task whose result is the path to the last variant's theme zip.
+    """
+    logger = config.logger
+    variants = variants or [(theme_name, help_off)]
+    fingerprints_path = os.path.join(working_dir, ".theme_fingerprints.json")
+    temp_theme_folder = os.path.join(working_dir, temp_theme_folder_name)
+    shared_parts = [part for part in THEME_PARTS if part != "scheme_files"]
+
+    def prepare(results):
+        import zipfile
+        file_hash_index_path = get_file_hash_index_path(working_dir)
+        load_file_hash_index(file_hash_index_path)
+        theme_shell_hash = get_directory_hash(theme_shell_dir)
+        variant_states = {}
+        previous_records = []
+        for variant_theme_name, variant_help_off in variants:
+            theme_zip_path = os.path.join(theme_output_dir, f"{variant_theme_name}.zip")
+            part_fingerprints = get_theme_part_fingerprints(glyph_assets_dir, template_scheme_path, lv_font_conv_path, font_ranges_path, variant_help_off, config)
+            theme_fingerprint = get_fingerprint(theme_shell_hash, part_fingerprints)
+            # Only trust the previous record if the zip it describes is still the one on disk
+            previous_record = load_theme_fingerprint(fingerprints_path, theme_zip_path)
+            if previous_record is not None:
+                previous_records.append((theme_zip_path, previous_record, part_fingerprints))
+            if previous_record is not None and previous_record["fingerprint"] == theme_fingerprint:
+                logger.info(f"Theme inputs are unchanged, keeping {theme_zip_path}")
+                continue
+            scheme_record = (previous_record or {}).get("parts", {}).get("scheme_files", {})
+            variant_states[theme_zip_path] = {"theme_fingerprint": theme_fingerprint,
+                                              "part_fingerprints": part_fingerprints,
+                                              "scheme_files": scheme_record.get("files") if scheme_record.get("fingerprint") == part_fingerprints["scheme_files"] else None}
+        save_file_hash_index(file_hash_index_path)
+        if not variant_states:
+            config.progress.emit("theme_skipped", reason="unchanged")
+            return None
+
+        # The shared parts don't depend on the variant, so any previous variant's zip can provide them
+        reused_part_sources = {}
+        for theme_zip_path, previous_record, part_fingerprints in previous_records:
+            for part in shared_parts:
+                if part not in reused_part_sources and previous_record["parts"].get(part, {}).get("fingerprint") == part_fingerprints[part]:
+                    reused_part_sources[part] = (theme_zip_path, previous_record["parts"][part]["files"])
+        shared_part_fingerprints = next(iter(variant_states.values()))["part_fingerprints"]
+        # Parts an interrupted run finished are still in the temporary folder, the journal says which are still valid
+        resumed_part_files = {}
+        if config.journal.resume and os.path.isdir(temp_theme_folder):
+            for part in shared_parts:
+                entry = config.journal.get(get_theme_part_journal_key(temp_theme_folder, part), shared_part_fingerprints[part])
+                if part not in reused_part_sources and entry is not None and all(os.path.isfile(os.path.join(temp_theme_folder, file_name)) for file_name in entry["files"]):
+                    resumed_part_files[part] = entry["files"]
+        reused_parts = [part for part in shared_parts if part in reused_part_sources]
+        if all(variant_state["scheme_files"] is not None for variant_state in variant_states.values()):
+            reused_parts.append("scheme_files")
+        rebuilt_parts = [part for part in THEME_PARTS if part not in reused_parts and part not in resumed_part_files]
+        logger.info(f"Rebuilding theme parts: {', '.join(rebuilt_parts) or 'none'}" + (f" (reusing {', '.join(reused_parts)})" if reused_parts else "")
+                    + (f" (resuming {', '.join(resumed_part_files)})" if resumed_part_files else ""))
+
+        if resumed_part_files:
+            # Keep only the resumed parts' files, the shell and anything reused are put back below
+            for relative_path in snapshot_files(temp_theme_folder):
+                if get_theme_part(relative_path) not in resumed_part_files:
+                    os.remove(os.path.join(temp_theme_folder, *relative_path.split("/")))
+            shutil.copytree(theme_shell_dir, temp_theme_folder, dirs_exist_ok=True)
+        else:
+            if os.path.exists(temp_theme_folder):
+                shutil.rmtree(temp_theme_folder)
+            shutil.copytree(theme_shell_dir, temp_theme_folder)
+
+        part_files = dict(resumed_part_files)
+        for part, (theme_zip_path, files) in reused_part_sources.items():
+            part_files[part] = files
+            with zipfile.ZipFile(theme_zip_path) as previous_zip:
+                for file_name in files:
+                    previous_zip.extract(file_name, temp_theme_folder)
+        logger.info(f"Generating Theme Images")
+        return {"variants": variant_states,
+                "shared_part_fingerprints": shared_part_fingerprints,
+                "rebuilt_parts": [part for part in shared_parts if part not in reused_part_sources and part not in resumed_part_files],
+                "part_files": part_files,
+                "files_before": snapshot_files(temp_theme_folder)}
+
+    def make_part_task(part):
+        def build_part(results):
+            theme_state = results["theme_prepare"]
+            if theme_state is None or part not in theme_state["rebuilt_parts"]:
+                return None
+            part_result = fillThemePart(part, temp_theme_folder, glyph_assets_dir, template_scheme_path, lv_font_conv_path, font_ranges_path, font_cache_path, help_off, config)
+            part_files = [relative_path for relative_path in snapshot_files(temp_theme_folder) if get_theme_part(relative_path) == part]
+            config.journal.record(get_theme_part_journal_key(temp_theme_folder, part), theme_state["shared_part_fingerprints"][part], files=part_files)
+            return part_result
+        return build_part
+
+    def make_scheme_files_task(theme_zip_path, variant_help_off):
+        def build_scheme_files(results):
+            import zipfile
+            theme_state = results["theme_prepare"]
+            variant_state = None if theme_state is None else theme_state["variants"].get(theme_zip_path)
+            if variant_state is None:
+                return None
+            # Variants take turns with the scheme folder, clear out the previous variant's
+            scheme_files_dir = os.path.join(temp_theme_folder, "scheme")
+            if os.path.exists(scheme_files_dir):
+                shutil.rmtree(scheme_files_dir)
+            if variant_state["scheme_files"] is not None:
+                with zipfile.ZipFile(theme_zip_path) as previous_zip:
+                    for file_name in variant_state["scheme_files"]:
+                        previous_zip.extract(file_name, temp_theme_folder)
+                return None
+            # Without fresh glyph sizes the scheme files measure the glyphs already in the theme folder
+            glyph_sizes = results.get("theme_glyphs")
+            return fillThemePart("scheme_files", temp_theme_folder, glyph_assets_dir, template_scheme_path, lv_font_conv_path, font_ranges_path, font_cache_path, variant_help_off, config, glyph_sizes)
+        return build_scheme_files
+
+    def make_zip_task(theme_zip_path, last_variant):
+        def zip_theme(results):
+            theme_state = results["theme_prepare"]
+            if theme_state is None:
+                return theme_zip_path
+            variant_state = theme_state["variants"].get(theme_zip_path)
+            if variant_state is not None:
+                # Attribute every file the parts wrote to the part that owns its path, for the next build to reuse
+                part_files = dict(theme_state["part_files"])
+                for part in theme_state["rebuilt_parts"] + ["scheme_files"]:
+                    part_files[part] = []
+                for relative_path in get_changed_files(temp_theme_folder, theme_state["files_before"]):
+                    part = get_theme_part(relative_path)
+                    if part in theme_state["rebuilt_parts"] or part == "scheme_files":
+                        part_files[part].append(relative_path)
+
+                os.makedirs(theme_output_dir, exist_ok=True)
+                if os.path.exists(theme_zip_path):
+                    os.remove(theme_zip_path)
+
+                config.progress.start_stage("theme_zip")
+                shutil.make_archive(theme_zip_path[:-len(".zip")], 'zip', temp_theme_folder)
+                config.progress.finish_stage()
+
+                save_theme_fingerprint(fingerprints_path, theme_zip_path, variant_state["theme_fingerprint"],
+                                       {part: {"fingerprint": variant_state["part_fingerprints"][part], "files": part_files.get(part, [])} for part in THEME_PARTS})
+            if last_variant:
+                shutil.rmtree(temp_theme_folder)
+            return theme_zip_path
+        return zip_theme
+
+    task_graph.add("theme_prepare", prepare)
+    for part in shared_parts:
+        task_graph.add(f"theme_{part}", make_part_task(part), ["theme_prepare"])
+    previous_zip_task = None
+    for index, (variant_theme_name, variant_help_off) in enumerate(variants):
+        theme_zip_path = os.path.join(theme_output_dir, f"{variant_theme_name}.zip")
+        task_suffix = "" if len(variants) == 1 else f"_{'no_help' if variant_help_off else 'help'}"
+        # Scheme files are laid out around the glyph sizes, and each variant waits for the one before it to be zipped
+        scheme_dependencies = ["theme_prepare", "theme_glyphs"] + ([previous_zip_task] if previous_zip_task else [])
+        task_graph.add(f"theme_scheme_files{task_suffix}", make_scheme_files_task(theme_zip_path, variant_help_off), scheme_dependencies)
+        previous_zip_task = f"theme_zip{task_suffix}"
+        task_graph.add(previous_zip_task, make_zip_task(theme_zip_path, index == len(variants)-1),
+                       [f"theme_{part}" for part in shared_parts] + [f"theme_scheme_files{task_suffix}"])
+    return previous_zip_task
+
+def get_theme_part_journal_key(temp_theme_folder, part):
+    """Get the checkpoint journal key of a theme part generated into a temporary theme folder."""
+    return f"theme_part|{os.path.abspath(temp_theme_folder)}|{part}"
+
+def get_theme_part_fingerprints(glyph_assets_dir, template_scheme_path, lv_font_conv_path, font_ranges_path, help_off, config:Config):
+    """
+    Fingerprint everything each part of the theme is generated from, so a part only needs rebuilding when its fingerprint changes.
+    :return: Dictionary of THEME_PARTS entry to hex digest.
+    """
+    screen = [config.screen_width, config.screen_height, get_program_hash()]
+    menu_panels = ["_default.png"] + list(MUXLAUNCH_IMAGES.values())
+    glyphs_fingerprint = get_fingerprint(screen, get_directory_hash(glyph_assets_dir))
+    return {
+        "menu_images": get_fingerprint(screen,
+                                       config.background_hex,
+                                       config.gap_between_panels,
+                                       config.icon_height_percent,
+                                       config.icon_width_percent,
+                                       config.deselected_brightness,
+                                       config.selected_brightness,
+                                       config.shadow_strength,
+                                       config.gradient_intensity,
+                                       config.compositor.name,
+                                       [get_file_hash(os.path.join(config.panels_dir, panel)) for panel in menu_panels],
+                                       get_file_hash(config.stylish_font_path)),
+        "boot_screens": get_fingerprint(screen, config.background_hex, get_file_hash(config.stylish_font_path)),
+        "fonts": get_fingerprint(screen,
+                                 get_file_hash(config.stylish_font_path),
+                                 get_file_hash(config.font_path),
+                                 get_file_hash(font_ranges_path),
+                                 get_lv_font_conv_id(lv_font_conv_path)),
+        "glyphs": glyphs_fingerprint,
+        "scheme_files": get_fingerprint(screen, config.background_hex, help_off, get_file_hash(template_scheme_path), glyphs_fingerprint),
+    }
+
+theme_fingerprint_lock = threading.Lock()
+
+def load_theme_fingerprint(fingerprints_path, theme_zip_path):
+    """
+    Get the fingerprint record saved when theme_zip_path was built.
+    :return: Record dictionary, or None if there isn't one or the zip has changed since.
+    """
+    with theme_fingerprint_lock:
+        try:
+            record = load_cache(fingerprints_path).get(os.path.realpath(theme_zip_path))
+            zip_stat = os.stat(theme_zip_path)
+        except (OSError, ValueError):
+            return None
+    if record is None or record.get("zip") != [zip_stat.st_size, zip_stat.st_mtime_ns]:
+        return None
+    return record
+
+def save_theme_fingerprint(fingerprints_path, theme_zip_path, theme_fingerprint, parts):
+    """Record the fingerprint of a freshly built theme zip, along with the fingerprint and files of each part."""
+    zip_stat = os.stat(theme_zip_path)
+    with theme_fingerprint_lock:
+        try:
+            fingerprints = load_cache(fingerprints_path)
+        except (OSError, ValueError):
+            fingerprints = {}
+        fingerprints[os.path.realpath(theme_zip_path)] = {"fingerprint": theme_fingerprint,
+                                                          "zip": [zip_stat.st_size, zip_stat.st_mtime_ns],
+                                                          "parts": parts}
+        save_cache(fingerprints, fingerprints_path)
+
+def encode_image(image, image_format="PNG", **save_options):
+    """
+    Encode an image to bytes.
+    :param image: PIL Image.
+    :param image_format: Any format PIL can save, e.g. "PNG" or "BMP".
+    :param save_options: Extra options for the format's encoder, e.g. compress_level for PNG.
+    :return: Encoded image bytes.
+    """
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, **save_options)
+    return buffer.getvalue()
+
+class Renderer(object):
+    """
+    Importable rendering API. Holds the Config along with decoded panels, logos, gradient and layout state,
+    so repeated renders from another process or script skip the startup and decoding cost.
+
+    Example:
+        renderer = Renderer.from_options(mode="box_art", screen_width=640, screen_height=480,
+                                         panels_dir=..., working_dir=..., stylish_font_path=..., roms_dir=..., ...)
+        image = renderer.render_folder("SNES")
+        png_bytes = renderer.render_menu(0, image_format="PNG")
+    """
+    # Render parameters a preview can override, and how to parse them
+    PREVIEW_PARAMETERS = {"selected_brightness": float,
+                          "deselected_brightness": float,
+                          "gap_between_panels": int,
+                          "gradient_intensity": int,
+                          "shadow_strength": int,
+                          "background_hex": str,
+                          "icon_height_percent": float,
+                          "icon_width_percent": float}
+    def __init__(self, config:Config, args=None):
+        self.config = config
+        self.args = args
+        if self.config.logo_image_cache is None:
+            self.config.logo_image_cache = LRUImageCache(8)
+        self.gradient_overlay_images = {}
+        self.preview_lock = threading.Lock()
+    @classmethod
+    def from_options(cls, mode, screen_width, screen_height, panels_dir, working_dir, stylish_font_path, logger=None, **options):
+        """
+        Build a Renderer from the same options as the command line, using the command line defaults for anything not given.
+        """
+        args = build_argument_parser().parse_args(["--mode", mode,
+                                                   "--screen_width", str(screen_width),
+                                                   "--screen_height", str(screen_height),
+                                                   "--panels_dir", panels_dir,
+                                                   "--working_dir", working_dir,
+                                                   "--stylish_font_path", stylish_font_path])
+        for option, value in options.items():
+            if not hasattr(args, option):
+                raise TypeError(f"Unknown option: {option}")
+            setattr(args, option, value)
+        return cls(Config(args, logger or module_logger), args)
+    def render_folder(self, folder_name, image_format=None):
+        """
+        Render the box art for one folder.
+        :param folder_name: Name of a folder in the ROMs directory.
+        :param image_format: If set, return the image encoded in this format instead of a PIL Image.
+        """
+        image = generateFolderImage(folder_name, self.config)
+        return encode_image(image, image_format) if image_format else image
+    def render_menu(self, index, image_format=None):
+        """
+        Render one muxlaunch menu frame.
+        :param index: Index of the menu item, in MUXLAUNCH_IMAGES order.
+        :param image_format: If set, return the image encoded in this format instead of a PIL Image.
+        """
+        image = generateMenuImage(index, list(MUXLAUNCH_IMAGES.keys()), list(MUXLAUNCH_IMAGES.values()), self.config)
+        return encode_image(image, image_format) if image_format else image
+    def get_preview_config(self, parameters):
+        """
+        Get a copy of the config with preview parameters overridden.
+        :param parameters: Dictionary of PREVIEW_PARAMETERS names to values, as strings or already parsed.
+        :raises ValueError: For unknown parameters or values that can't be parsed.
+        """
+        config = copy.copy(self.config)
+        for name, value in parameters.items():
+            if name not in self.PREVIEW_PARAMETERS:
+                raise ValueError(f"Unknown preview parameter: {name}")
+            try:
+                setattr(config, name, self.PREVIEW_PARAMETERS[name](value))
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid value for {name}: {value!r}")
+        from PIL import ImageColor
+        try:
+            ImageColor.getcolor(config.background_hex, "RGBA")
+        except ValueError:
+            raise ValueError(f"Invalid value for background_hex: {config.background_hex!r}")
+        config.max_icon_height = (config.screen_height * config.icon_height_percent)
+        config.max_icon_width = (config.screen_width * config.icon_width_percent)
+        # The gradient is the only cached layer that doesn't key on its parameters, so keep one per intensity
+        config.gradient_overlay_image = self.gradient_overlay_images.get(config.gradient_intensity)
+        config.gradient_overlay_lock = threading.Lock()
+        return config
+    def render_preview(self, kind, item, parameters=None):
+        """
+        Render one frame with some render parameters overridden, for tuning them without a full run.
+        :param kind: "box_art" or "menu".
+        :param item: Folder name for box art, or muxlaunch item name or index for a menu frame.
+        :param parameters: Dictionary of PREVIEW_PARAMETERS names to values.
+        :return: PNG bytes.
+        :raises KeyError: If the folder or menu item doesn't exist.
+        :raises ValueError: For an unknown kind or bad parameters.
+        """
+        with self.preview_lock:
+            config = self.get_preview_config(parameters or {})
+            if kind == "box_art":
+                if item not in config.folders:
+                    raise KeyError(f"Unknown folder: {item}")
+                image = generateFolderImage(item, config)
+            elif kind == "menu":
+                menu_items = list(MUXLAUNCH_IMAGES.keys())
+                if str(item).isdigit() and int(item) < len(menu_items):
+                    index = int(item)
+                elif item in menu_items:
+                    index = menu_items.index(item)
+                else:
+                    raise KeyError(f"Unknown menu item: {item}")
+                image = generateMenuImage(index, menu_items, list(MUXLAUNCH_IMAGES.values()), config)
+            else:
+                raise ValueError(f"Unknown preview kind: {kind}")
+            self.gradient_overlay_images[config.gradient_intensity] = config.gradient_overlay_image
+        return encode_image(image, "PNG", compress_level=1)
+    def build_theme(self, theme_output_dir=None, theme_name=None, help_off=None):
+        """
+        Build the whole theme.
+        :param theme_output_dir: Directory to write the theme zip to (default: a temporary directory).
+        :param theme_name: Name of the theme zip (default: the configured theme name).
+        :param help_off: Whether to hide the help footer (default: the configured value).
+        :return: Theme zip bytes.
+        """
+        import tempfile
+        theme_name = theme_name or self.args.theme_name or "AutoArtBookNext"
+        help_off = self.args.help_off if help_off is None else help_off
+        with tempfile.TemporaryDirectory() as temporary_output_dir:
+            theme_zip_path = buildTheme(self.config.working_dir,
+                                        self.args.theme_shell_dir,
+                                        self.args.glyph_assets_dir,
+                                        self.args.template_scheme_path,
+                                        self.args.lv_font_conv_path,
+                                        self.args.font_ranges_path,
+                                        self.args.font_cache_path,
+                                        help_off,
+                                        theme_output_dir or temporary_output_dir,
+                                        theme_name,
+                                        self.config)
+            with open(theme_zip_path, "rb") as f:
+                return f.read()
+
+def warmUpPreview(renderer:Renderer, logger):
+    """Render one of each kind of frame, so the first real preview doesn't pay for decoding panels, logos and fonts."""
+    start_time = time.perf_counter()
+    if renderer.config.folders:
+        renderer.render_preview("box_art", renderer.config.folders[0])
+    renderer.render_preview("menu", 0)
+    logger.info(f"Preview warmed up in {(time.perf_counter()-start_time)*1000:.0f} ms")
+
+def runPreviewServer(renderer:Renderer, port, logger):
+    """
+    Serve preview frames over HTTP on localhost until interrupted.
+    GET / lists the folders, menu items and parameters, GET /box_art/<folder> and GET /menu/<item or index> return PNGs.
+    Parameters are given in the query string, e.g. /box_art/SNES?selected_brightness=0.9&gradient_intensity=180
+    """
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+    from urllib.parse import urlsplit, parse_qsl, unquote
+
+    class PreviewRequestHandler(BaseHTTPRequestHandler):
+        def send_bytes(self, status, content_type, body, headers=None):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+        def do_GET(self):
+            url = urlsplit(self.path)
+            path_parts = [unquote(part) for part in url.path.split("/") if part]
+            if not path_parts:
+                listing = {"folders": renderer.config.folders,
+                           "menu": list(MUXLAUNCH_IMAGES.keys()),
+                           "parameters": list(Renderer.PREVIEW_PARAMETERS)}
+                self.send_bytes(200, "application/json", json.dumps(listing).encode())
+                return
+            if len(path_parts) != 2:
+                self.send_bytes(404, "text/plain", b"Use /box_art/<folder> or /menu/<item>")
+                return
+            start_time = time.perf_counter()
+            try:
+                png = renderer.render_preview(path_parts[0], path_parts[1], dict(parse_qsl(url.query)))
+            except KeyError as e:
+                self.send_bytes(404, "text/plain", str(e.args[0]).encode())
+                return
+            except ValueError as e:
+                self.send_bytes(400, "text/plain", str(e).encode())
+                return
+            render_time = (time.perf_counter()-start_time)*1000
+            logger.info(f"Preview {url.path} rendered in {render_time:.0f} ms")
+            self.send_bytes(200, "image/png", png, {"X-Render-Time-Ms": f"{render_time:.1f}"})
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    server = HTTPServer(("127.0.0.1", port), PreviewRequestHandler)
+    logger.info(f"Preview server listening on http://127.0.0.1:{server.server_address[1]}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+def runPreviewLoop(renderer:Renderer, input_stream, output_stream, logger):
+    """
+    Serve preview frames over a pipe: read one JSON request per line, e.g.
+    {"kind": "box_art", "item": "SNES", "parameters": {"selected_brightness": 0.9}}
+    and reply with a JSON header line, {"ok": true, "bytes": N, "render_ms": T}, followed by N bytes of PNG,
+    or {"ok": false, "error": "..."} on its own.
+    :param input_stream: Text stream to read requests from.
+    :param output_stream: Binary stream to write replies to.
+    """
+    for line in input_stream:
+        if not line.strip():
+            continue
+        start_time = time.perf_counter()
+        try:
+            request = json.loads(line)
+            png = renderer.render_preview(request.get("kind"), request.get("item"), request.get("parameters"))
+        except KeyError as e:
+            header, png = {"ok": False, "error": str(e.args[0])}, b""
+        except (ValueError, AttributeError) as e:
+            header, png = {"ok": False, "error": str(e)}, b""
+        else:
+            header = {"ok": True, "bytes": len(png), "render_ms": round((time.perf_counter()-start_time)*1000, 1)}
+            logger.debug(f"Preview {request.get('kind')} {request.get('item')} rendered in {header['render_ms']} ms")
+        output_stream.write(json.dumps(header).encode() + b"\n" + png)
+        output_stream.flush()
+
+def build_argument_parser():
+    """
+    Build the command line argument parser, also used by Renderer for its defaults.
+    :return: ArgumentParser instance.
+    """
+    # Define arguments
     parser = argparse.ArgumentParser(
         description="Validate directories and configure optional settings."
     )
@@ -1315,8 +3871,12 @@ def main():
     )
 
     # Required arguments
-    parser.add_argument("--screen_height", type=int, required=True, help="Screen height in pixels")
-    parser.add_argument("--screen_width", type=int, required=True, help="Screen width in pixels")
+    parser.add_argument("--screen_height", type=int, help="Screen height in pixels (required unless --screen_size is given)")
+    parser.add_argument("--screen_width", type=int, help="Screen width in pixels (required unless --screen_size is given)")
+    parser.add_argument(
+        "--screen_size", type=parse_screen_size, nargs="+",
+        help="One or more screen sizes as WIDTHxHEIGHT (e.g. 640x480 720x720). With more than one, each is generated in parallel into a WIDTHxHEIGHT subfolder of the box art and theme output directories"
+    )
     parser.add_argument("--panels_dir", required=True, help="Path to the system image panels directory")
     parser.add_argument("--working_dir", required=True, help="Path to the folder where your the script will use to store temporary files and folders")
     parser.add_argument("--stylish_font_path", required=True, help="Path to the stylish font file")
@@ -1396,6 +3956,10 @@ def main():
         action="store_true",
         help="If set, disables help footer in muxlaunch and muxplore. Defaults to False."
     )
+    parser.add_argument(
+        "--theme_variants", choices=list(THEME_VARIANTS), nargs="+",
+        help="Build several variants of the theme in one run, sharing their images, fonts and glyphs: help is THEME_NAME.zip, no_help is 'THEME_NAME Hide Help.zip' with the help footer disabled"
+    )
 
     # Optional arguments with defaults
     parser.add_argument(
@@ -1430,9 +3994,82 @@ def main():
         "--gradient_intensity", type=int, default=235,
         help="The intensity of the gradient overlaid (default is 235: 0-255)"
     )
+    parser.add_argument(
+        "--progress_file",
+        help="If set, write JSON lines progress events (stage, counts, elapsed time and ETA) to this file"
+    )
+    parser.add_argument(
+        "--progress_fd", type=int,
+        help="If set, write JSON lines progress events to this already open file descriptor instead of a file"
+    )
+    parser.add_argument(
+        "--log_level", choices=["DEBUG", "INFO", "WARNING", "ERROR"], default="INFO",
+        help="Minimum level of messages to log (default is INFO, use DEBUG for per item messages)"
+    )
+    parser.add_argument(
+        "--backend", choices=list(COMPOSITORS), default="pil",
+        help="Compositing backend for panel brightness and layer blending (default is pil, numpy needs NumPy installed)"
+    )
+    parser.add_argument(
+        "--output_mode", choices=["rgba", "rgb", "palette"], default="rgba",
+        help="How box art PNGs are stored: rgba as rendered, rgb without the alpha channel when a frame is opaque, or palette quantised to an adaptive palette (default is rgba)"
+    )
+    parser.add_argument(
+        "--palette_colours", type=int, default=256,
+        help="Number of colours in the palette for --output_mode palette (default is 256: int[2-256])"
+    )
+    parser.add_argument("--no_dither", action="store_true", help="Don't dither when quantising to a palette")
+    parser.add_argument(
+        "--target_temperature", type=float,
+        help="If set, hold the device's hottest thermal zone at or below this many degrees Celsius by using fewer workers and pausing between frames"
+    )
+    parser.add_argument(
+        "--target_load", type=float,
+        help="If set, hold the 1 minute load average per available CPU at or below this by using fewer workers and pausing between frames"
+    )
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="Continue an interrupted run: skip box art and theme parts the checkpoint journal in the working directory records as done from the same inputs"
+    )
+    parser.add_argument(
+        "--preview", choices=["http", "stdin"],
+        help="Instead of generating, keep assets loaded and render single frames on request with overridden parameters: over HTTP on localhost, or as JSON lines on stdin with PNGs written to stdout"
+    )
+    parser.add_argument(
+        "--preview_port", type=int, default=8765,
+        help="Port for --preview http (default is 8765)"
+    )
+    parser.add_argument(
+        "--startup_report", action="store_true",
+        help="Log how long each step of starting up took, and the assets that were loaded when first needed"
+    )
+    parser.add_argument(
+        "--render_processes", type=int, default=1,
+        help="Number of worker processes to render box art on, sharing decoded panels and logos through shared memory (default is 1, render in this process)"
+    )
 
-    args = parser.parse_args()
+    return parser
 
+def main(argv=None):
+    startup_report.mark("imports")
+    parser = build_argument_parser()
+    args = parser.parse_args(argv)
+
+    if args.screen_size:
+        screen_sizes = list(dict.fromkeys(args.screen_size))
+        args.screen_width, args.screen_height = screen_sizes[0]
+    elif args.screen_width is None or args.screen_height is None:
+        parser.error("--screen_width and --screen_height are required unless --screen_size is given.")
+    else:
+        screen_sizes = [(args.screen_width, args.screen_height)]
+
+    if not 2 <= args.palette_colours <= 256:
+        parser.error("--palette_colours must be between 2 and 256.")
+    if args.render_processes < 1:
+        parser.error("--render_processes must be at least 1.")
+
+    if args.theme_variants and args.help_off:
+        parser.error("--help_off can't be combined with --theme_variants, list no_help as a variant instead.")
     if args.mode in ["theme", "both"] and not args.theme_output_dir:
         parser.error("--theme_output_dir is required when mode is 'theme' or 'both'.")
     if args.mode in ["theme", "both"] and not args.theme_shell_dir:
@@ -1468,8 +4105,27 @@ def main():
     
     
 
-    logger = setup_logger(args.working_dir)
+    # Replies to --preview stdin go to stdout, so logs go to stderr instead
+    logger = setup_logger(args.working_dir, log_level=args.log_level, stream=sys.stderr if args.preview == "stdin" else sys.stdout)
+    startup_report.mark("parse arguments and set up logging")
 
+    progress = ProgressReporter.from_args(args.progress_file, args.progress_fd)
+    try:
+        run(args, screen_sizes, logger, progress)
+    except BaseException:
+        # Whatever stopped the run, tell anyone following the progress stream that it is over
+        progress.close(status="error")
+        raise
+    progress.close()
+
+def run(args, screen_sizes, logger, progress):
+    """
+    Check the paths and generate everything the arguments ask for.
+    :param args: Parsed arguments, see build_argument_parser.
+    :param screen_sizes: List of (width, height) tuples to generate.
+    :param logger: Logger instance.
+    :param progress: ProgressReporter for the run, closed by the caller.
+    """
     logger.info("=" * 50)  # Divider line
     logger.info("Checking if given directories are valid")
     logger.info("=" * 50)
@@ -1517,36 +4173,61 @@ def main():
     if not all(theme_validations) and args.mode in ["theme", "both"]:
         logger.error("One or more rquired directories for theme generation are invalid. Please check the paths and try again.")
         sys.exit(1)
-    if not check_lv_font_conv(args.lv_font_conv_path) and args.mode in ["theme", "both"]:
-        logger.error("lv_font_conv is not installed or the path is incorrect.")
-        sys.exit(1)
+    startup_report.mark("validate paths")
+    if args.mode in ["theme", "both"]:
+        if not check_lv_font_conv(args.lv_font_conv_path, os.path.join(args.working_dir, ".lv_font_conv_check.json")):
+            logger.error("lv_font_conv is not installed or the path is incorrect.")
+            sys.exit(1)
+        startup_report.mark("check lv_font_conv")
+    if args.backend == "numpy":
+        try:
+            import numpy
+        except ImportError:
+            logger.error("The numpy backend needs NumPy installed (pip install numpy), or use --backend pil.")
+            sys.exit(1)
 
     logger.info("All directories are valid. Proceeding with the next steps...")
-    config = Config(args, logger)
+    config = Config(args, logger, progress)
     config.log_config()
+    startup_report.mark("load configuration")
+
+    if args.preview:
+        renderer = Renderer(config, args)
+        warmUpPreview(renderer, logger)
+        if args.startup_report:
+            startup_report.mark("warm up preview")
+            startup_report.log(logger)
+        if args.preview == "http":
+            runPreviewServer(renderer, args.preview_port, logger)
+        else:
+            runPreviewLoop(renderer, sys.stdin, sys.stdout.buffer, logger)
+        return
 
-    if args.mode in ["box_art", "both"]:
-        logger.info("Generating folder box art...")
-        for folder in config.folders:
-            generateFolderImage(folder, config).save(os.path.join(config.box_art_dir, f"{folder}.png"))
-            logger.info(f"Successfully generated image for folder: {folder}")
-
-    if args.mode in ["theme", "both"]:
-        temp_theme_folder = os.path.join(args.working_dir, ".temp_theme_folder")
-        if os.path.exists(temp_theme_folder):
-            shutil.rmtree(temp_theme_folder)
-        shutil.copytree(args.theme_shell_dir, temp_theme_folder)
-        
-        fillTempThemeFolder(temp_theme_folder, args.glyph_assets_dir, args.template_scheme_path, args.lv_font_conv_path, args.font_ranges_path, args.font_cache_path, args.help_off, config)
-        
-        theme_output_dir = args.theme_output_dir
-        os.makedirs(theme_output_dir, exist_ok=True)
-
-        if os.path.exists(os.path.join(theme_output_dir, f"{args.theme_name}.zip")):
-            os.remove(os.path.join(theme_output_dir, f"{args.theme_name}.zip"))
+    config.progress.emit("run_start", mode=args.mode)
 
-        shutil.make_archive(os.path.join(theme_output_dir, args.theme_name), 'zip', temp_theme_folder)
-        shutil.rmtree(temp_theme_folder)
+    if len(screen_sizes) == 1:
+        generateTarget(args, config)
+    else:
+        # Every target shares the folders, associations and decoded panels, so give the panel cache room for all of them
+        config.panel_image_cache.maxsize *= len(screen_sizes)
+        logger.info(f"Generating {len(screen_sizes)} screen sizes: {', '.join(f'{w}x{h}' for w, h in screen_sizes)}")
+        with ThreadPoolExecutor(max_workers=config.governor.get_workers(min(len(screen_sizes), os.cpu_count() or 1), "screen sizes")) as executor:
+            futures = {}
+            for screen_width, screen_height in screen_sizes:
+                target_name = f"{screen_width}x{screen_height}"
+                target_config = config.with_screen_size(screen_width, screen_height, config.progress.for_target(target_name))
+                futures[executor.submit(generateTarget, args, target_config, target_name)] = target_name
+            for future in as_completed(futures):
+                future.result()
+                logger.info(f"Finished screen size {futures[future]}")
+
+    config.governor.log_stats()
+    config.journal.close()
+    if args.startup_report:
+        startup_report.log(logger)
     
 if __name__ == "__main__":
+    # In a PyInstaller build, worker processes start this same executable, this makes them run as workers rather than run main again
+    import multiprocessing
+    multiprocessing.freeze_support()
     main()